@@ -159,5 +159,25 @@ rc=$?
 set -e
 [[ $rc -ne 0 ]] || die "unknown gid should fail"
 
+# --- intel snippet spans: LF and CRLF sources give the same lines ---
+msg "intel: snippet spans (LF + CRLF)"
+"$PY" - "$WORK" <<'PY' || die "snippet span mismatch"
+import sys, pathlib
+from glyph.intel import _line_index, _read_span, _read_span_indexed
+lines = ["int a;", "", "int f(void){", "  return 1;", "}", "", "int b;"]
+for nl in ("\n", "\r\n"):
+    for tail in ("", nl):
+        p = pathlib.Path(sys.argv[1]) / f"span{len(nl)}{len(tail)}.c"
+        p.write_bytes((nl.join(lines) + tail).encode())
+        text = p.read_bytes().decode()  # ASCII: str offsets are byte offsets
+        start, end = text.index("int f"), text.index("}") + 1
+        for k in range(4):
+            lo = max(0, 2 - k); hi = min(len(lines), 5 + k)
+            want = "\n".join(lines[lo:hi])
+            got = _read_span(str(p), start, end, surround_lines=k)
+            got_ix = _read_span_indexed(_line_index(str(p)), start, end, surround_lines=k)
+            assert got == want and got_ix == want, (repr(nl), repr(tail), k, got, got_ix, want)
+PY
+
 msg "ALL OK"
 echo "DB: $DB"
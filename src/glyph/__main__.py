@@ -1,8 +1,15 @@
 # glyph/__main__.py
 from __future__ import annotations
-from .app import app
+
+import sys
+
 
 def main() -> None:
+    from .fastcli import try_fast
+    rc = try_fast(sys.argv[1:])
+    if rc is not None:
+        sys.exit(rc)
+    from .app import app
     app()
 
 if __name__ == "__main__":
@@ -1,13 +1,18 @@
 # src/glyph/app.py
 from __future__ import annotations
 
+import os
+import re
 import shlex
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import typer
 
+if TYPE_CHECKING:
+    from .rewriter import Entity as REntity, RewriteResult
+
 from . import __version__
 from .io import (
     configure,
@@ -25,6 +30,18 @@ ai = typer.Typer(help="LLM-assisted queries over a Glyph DB (Ollama-backed)")
 plan = typer.Typer(help="Repo-aware planning: explain, propose, impact, status")
 git = typer.Typer(help="Git integration: plan/apply/snapshot")
 
+try:
+    import re2 as _dfa_re  # optional: linear-time DFA engine (google-re2)
+except ImportError:  # pragma: no cover
+    _dfa_re = re
+
+# exact-name lookup gate for `db search`
+_IDENT_RX = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# textual call-site fallback (dbv ingest); bytes so match offsets are entity offsets
+_CALL_RX = _dfa_re.compile(rb"\b([A-Za-z_]\w*)\s*\(")
+_CALL_BLACKLIST = frozenset({b"if",b"for",b"while",b"switch",b"return",b"sizeof",b"typedef",b"struct",b"union",b"enum"})
+
 app.add_typer(dbv, name="dbv")
 app.add_typer(dbv, name="db")  # alias
 app.add_typer(ai, name="ai")
@@ -37,54 +54,187 @@ app.add_typer(git, name="git")
 # ──────────────────────────────────────────────────────────────────────────────
 
 def _read_text(p: str) -> str:
-    return sys.stdin.read() if p == "-" else Path(p).read_text(encoding="utf-8", errors="ignore")
+    # raw bytes + one utf-8 decode; skips the locale-dependent text layer on stdin
+    data = sys.stdin.buffer.read() if p == "-" else Path(p).read_bytes()
+    return data.decode("utf-8", "ignore")
+
+def _write_out(s: str) -> None:
+    """Payload → stdout as utf-8 bytes, bypassing click's echo encoding."""
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:  # captured/replaced stdout
+        typer.echo(s, nl=False)
+        return
+    sys.stdout.flush()
+    out.write(s.encode("utf-8"))
+    out.flush()
+
+def _read_bytes(p: str) -> bytes:
+    """
+    Raw UTF-8 source. Invalid sequences are dropped (as _read_text does) so
+    byte offsets from libclang line up with what the DB stores.
+    """
+    data = sys.stdin.buffer.read() if p == "-" else Path(p).read_bytes()
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        data = data.decode("utf-8", "ignore").encode("utf-8")
+    return data
+
+def _split_spec(spec: str) -> Tuple[str, str]:
+    # name@path; the first '@' separates, so paths may still contain one
+    name, sep, path = spec.partition("@")
+    return (name, path) if sep else (os.path.basename(spec), spec)
 
 def _parse_files(specs: List[str]) -> Dict[str, str]:
     out: Dict[str, str] = {}
     for spec in specs:
-        try:
-            name, path = spec.split("@", 1)
-        except ValueError:
-            name, path = (Path(spec).name, spec)
+        name, path = _split_spec(spec)
         out[name] = _read_text(path)
     return out
 
-def _parse_items(specs: List[str]) -> List[Tuple[str, str, str]]:
-    items: List[Tuple[str, str, str]] = []
+def _parse_items(specs: List[str]) -> Iterator[Tuple[str, str, bytes]]:
+    # lazy: each source is read only when its parse job is submitted
     for spec in specs:
+        name, path = _split_spec(spec)
+        yield (name, path, _read_bytes(path))
+
+def _pmap(fn: Callable, jobs: Iterable, workers: int, count: Optional[int] = None) -> Iterator:
+    """
+    Ordered map of fn over jobs. workers=1 (or a single job) stays in-process;
+    otherwise fans out to a process pool (workers=0 → one per CPU). At most
+    2×workers results are in flight, which bounds memory on large trees.
+    jobs may be a lazy iterator if count (its length) is given.
+    """
+    if workers == 1 or (len(jobs) if count is None else count) < 2:
+        yield from map(fn, jobs)
+        return
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        window: deque = deque()
+        for job in jobs:
+            window.append(ex.submit(fn, job))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+def _include_deps(tu) -> List[Tuple[str, int, int]]:
+    """(path, mtime_ns, size) of each file tu included; validates rewrite-cache rows."""
+    seen: set[str] = set()
+    out: List[Tuple[str, int, int]] = []
+    for inc in tu.get_includes():
+        p = os.path.abspath(inc.include.name)  # checked later from any cwd
+        if p in seen:
+            continue
+        seen.add(p)
         try:
-            name, path = spec.split("@", 1)
-        except ValueError:
-            path = spec
-            name = Path(path).name
-        items.append((name, path, _read_text(path)))
-    return items
+            st = os.stat(p)
+        except OSError:
+            continue
+        out.append((p, st.st_mtime_ns, st.st_size))
+    return out
+
+def _scan_parse(job: Tuple[str, str, List[str]]) -> Tuple["RewriteResult", List[Tuple[str, int, int]], bytes]:
+    # process-pool worker for `scan`: read + parse + rewrite one file. Returns
+    # the header stamps its cache row is checked against, and the bytes parsed
+    from .rewriter import parse_tu, rewrite_from_tu
+    path, filename, args = job
+    code = _read_bytes(path)
+    tu = parse_tu(code, filename=filename, extra_args=args)
+    return rewrite_from_tu(tu, code, filename=filename), _include_deps(tu), code
+
+def _fallback_calls(code: bytes, fns: List["REntity"]) -> dict[str, set[str]]:
+    # scan each function body in place (pos/endpos window, no slice copy);
+    # text between functions (tables, decls) is never touched
+    calls_by_src: dict[str, set[str]] = {}
+    # keywords and self-references are dropped as raw bytes, before any decode;
+    # each distinct callee name is then decoded once
+    for e in fns:
+        raw = {m.group(1) for m in _CALL_RX.finditer(code, e.start, e.end)}
+        raw -= _CALL_BLACKLIST
+        raw.discard(e.name.encode("utf-8"))
+        if raw:
+            calls_by_src[e.gid] = {n.decode("ascii") for n in raw}
+    return calls_by_src
+
+def _ingest_parse(job: Tuple[str, bytes, List[str], Optional["RewriteResult"]]) -> tuple:
+    """
+    process-pool worker for `dbv ingest`: rewrite (unless cached) + call graph
+    for one file. Returns (RewriteResult, deps, e_src, e_dst, e_name) where deps
+    are the included headers' stamps (None on a cache hit) and the edges are
+    parallel columns (src gid, dst gid | None, dst name).
+    """
+    from .rewriter import parse_tu, rewrite_from_tu
+    from .graph import callgraph_from_tu
+    name, code, args, res = job
+    # one libclang parse feeds both the rewrite and the call graph
+    tu = None
+    deps = None
+    if res is None:
+        tu = parse_tu(code, filename=name, extra_args=args)
+        res = rewrite_from_tu(tu, code, filename=name)
+        deps = _include_deps(tu)
+    ents = res.entities
+
+    e_src: List[str] = []
+    e_dst: List[Optional[str]] = []
+    e_name: List[str] = []
+
+    name2gid_defs: Dict[str, str] = {e.name: e.gid for e in ents if e.kind == "fn"}
+    fn_ents = [e for e in ents if e.kind == "fn"]
+    if not fn_ents:
+        # no local definitions (e.g. headers) → no call sources; skip the
+        # second libclang parse and the textual fallback entirely
+        return res, deps, e_src, e_dst, e_name
+
+    cg = callgraph_from_tu(tu or parse_tu(code, filename=name, extra_args=args), filename=name)
+    added: Dict[str, set[str]] = {}
+
+    # AST-derived edges (src must be local definition; dst→defs if known).
+    # Each call-graph node is resolved once up front: id -> (name, def gid)
+    defs_get, names_get, edges_get = name2gid_defs.get, cg.names.get, cg.edges.get
+    resolved = {cid: (nm, defs_get(nm)) for cid, nm in cg.names.items() if nm}
+    for src in cg.roots:
+        src_gid = defs_get(names_get(src))
+        if not src_gid:
+            continue
+        dsts = [resolved[d] for d in edges_get(src, ()) if d in resolved]
+        if dsts:
+            e_src.extend([src_gid] * len(dsts))
+            e_name.extend(dst_name for dst_name, _ in dsts)
+            e_dst.extend(dst_gid for _, dst_gid in dsts)
+            added[src_gid] = {dst_name for dst_name, _ in dsts}
+
+    # Fallback textual scan
+    fb = _fallback_calls(code, fn_ents)
+    for src_gid, names in fb.items():
+        already = added.get(src_gid, set())
+        extra = names - already
+        e_src.extend([src_gid] * len(extra))
+        e_name.extend(extra)
+        e_dst.extend(name2gid_defs.get(n) for n in extra)
+
+    return res, deps, e_src, e_dst, e_name
+
+def _rewrite_key(code: bytes, filename: str, args: List[str]) -> bytes:
+    """
+    Content key for the DB rewrite cache. Included headers are not part of the
+    key; the row stores their stamps and get_rewrite() rejects it once one changes.
+    """
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    for part in (__version__, filename, *args):
+        h.update(part.encode("utf-8") + b"\0")
+    h.update(code)
+    return h.digest()
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # global options / entrypoint
 # ──────────────────────────────────────────────────────────────────────────────
 
-def _cli_version() -> str:
-    import subprocess
-    attempts = (
-        ["glyph", "--version"],
-        [sys.executable, "-m", "glyph", "--version"],
-    )
-    last_err = None
-    for cmd in attempts:
-        try:
-            r = subprocess.run(cmd, text=True, capture_output=True, check=True)
-            out = (r.stdout or r.stderr).strip()
-            if out:
-                return out
-        except Exception as e:
-            last_err = e
-    try:
-        return f"glyph {__version__}"
-    except Exception:
-        raise RuntimeError(f"cannot execute glyph CLI: {last_err!r}")
-
 def _version_cb(value: bool):
     if value:
         typer.echo(f"glyph {__version__}")
@@ -127,9 +277,9 @@ def rewrite(
 ):
     from .rewriter import rewrite_snippet
     heading("Rewriting")  # human-only
-    res = rewrite_snippet(_read_text(file), filename=name, extra_args=shlex.split(cflags))
+    res = rewrite_snippet(_read_bytes(file), filename=name, extra_args=shlex.split(cflags))
     # final payload is the code → stdout
-    typer.echo(res.code, nl=False)
+    _write_out(res.code)
 
 @app.command(help="Emit compact JSONL pack for LLMs")
 def pack(
@@ -138,10 +288,10 @@ def pack(
     cflags: str = typer.Option("", "--cflags", help="Compiler flags"),
 ):
     from .llm_pack import pack_snippets
-    snippets = _parse_files(files) if files else {name: sys.stdin.read()}
+    snippets = _parse_files(files) if files else {name: _read_text("-")}
     heading("Packing snippets")
     out = pack_snippets(snippets, extra_args=shlex.split(cflags))
-    typer.echo(out.to_str(), nl=False)
+    _write_out(out.to_str())
 
 @app.command(help="Summarize entities/calls/gaps across inputs")
 def tree(
@@ -150,7 +300,7 @@ def tree(
     cflags: str = typer.Option("", "--cflags"),
 ):
     from .tree_agent import build_units, infer_summary
-    snippets = _parse_files(files) if files else {name: sys.stdin.read()}
+    snippets = _parse_files(files) if files else {name: _read_text("-")}
     heading("Building units")
     units = build_units(snippets, extra_args=shlex.split(cflags))
     summary = infer_summary(units)
@@ -162,13 +312,18 @@ def deps(
     file: str = typer.Option("-", "--file"),
     name: str = typer.Option("snippet.c", "--name"),
     cflags: str = typer.Option("", "--cflags"),
+    pch: Optional[str] = typer.Option(None, "--pch", help="Precompiled header to include (see graph.build_pch)"),
 ):
     from .graph import callgraph_snippet
-    cg = callgraph_snippet(_read_text(file), filename=name, extra_args=shlex.split(cflags))
-    for src in sorted(cg.roots):
-        for dst in sorted(cg.edges.get(src, set())):
-            nm = cg.names.get(dst, "")
-            typer.echo(f"{src} -> {dst}" + (f"  # {nm}" if nm else ""))
+    cg = callgraph_snippet(_read_bytes(file), filename=name, extra_args=shlex.split(cflags), pch_path=pch)
+    # one sort over flat (src, dst) pairs, one write for the whole listing
+    names = cg.names
+    pairs = sorted((src, dst) for src in cg.roots for dst in cg.edges.get(src, ()))
+    if pairs:
+        typer.echo("\n".join(
+            f"{src} -> {dst}  # {names[dst]}" if names.get(dst) else f"{src} -> {dst}"
+            for src, dst in pairs
+        ))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -191,69 +346,44 @@ def dbv_ingest(
     files: List[str] = typer.Option(..., "--file", help="name@path (repeatable)"),
     cflags: str = typer.Option("", "--cflags", help="Compiler flags for parsing"),
     db: str = typer.Option(".glyph/idx.sqlite", "--db", help="Database path"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse rewrites of unchanged sources"),
+    jobs: int = typer.Option(0, "--jobs", "-j", help="Parallel parse workers (0 = all CPUs, 1 = serial)"),
+    fast: bool = typer.Option(False, "--fast", help="Bulk mode: defer FTS/index upkeep to one rebuild at the end"),
 ):
-    import re
-    from .db import GlyphDB
-    from .rewriter import rewrite_snippet, Entity as REntity
-    from .graph import callgraph_snippet
+    from collections import deque
+    from contextlib import nullcontext
+    from .db import CallColumns, GlyphDB
+    from .rewriter import RewriteResult
 
     Path(db).parent.mkdir(parents=True, exist_ok=True)
-    items = _parse_items(files)
-
-    ident_rx = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
-    blacklist = {"if","for","while","switch","return","sizeof","typedef","struct","union","enum"}
-
-    def _fallback_calls(code: str, fns: List[REntity]) -> dict[str, set[str]]:
-        calls_by_src: dict[str, set[str]] = {}
-        b = code.encode("utf-8", "ignore")
-        for e in fns:
-            seg = b[e.start:e.end].decode("utf-8", "ignore")
-            cands = set(m.group(1) for m in ident_rx.finditer(seg))
-            cands.discard(e.name)
-            cands.difference_update(blacklist)
-            if cands:
-                calls_by_src[e.gid] = cands
-        return calls_by_src
-
-    with GlyphDB(db) as gdb:
-        for name, path, code in items:
+    cflag_args = shlex.split(cflags)
+
+    def _batch(gdb: GlyphDB) -> Iterator[tuple]:
+        # sources are read as jobs are submitted, so only the in-flight window
+        # of files is held in memory; `pending` carries each one to its result
+        pending: deque = deque()
+
+        def _work() -> Iterator[tuple]:
+            for name, path, code in _parse_items(files):
+                key = _rewrite_key(code, name, cflag_args)
+                hit = gdb.get_rewrite(key) if cache else None
+                pending.append((path, key, code))
+                yield (name, code, cflag_args, RewriteResult(*hit) if hit else None)
+
+        # libclang work runs in worker processes; SQLite writes stay here, in
+        # input order
+        for out in _pmap(_ingest_parse, _work(), jobs, count=len(files)):
+            path, key, code = pending.popleft()
+            res, deps, e_src, e_dst, e_name = out
             emit_info(f"ingest: {path}")
-            res = rewrite_snippet(code, filename=name, extra_args=shlex.split(cflags))
-            ents = list(res.entities)
-
-            name2gid_defs: Dict[str, str] = {e.name: e.gid for e in ents if e.kind == "fn"}
-            fn_ents: List[REntity] = [e for e in ents if e.kind == "fn"]
-
-            cg = callgraph_snippet(code, filename=name, extra_args=shlex.split(cflags))
-            edges: List[Tuple[str, Optional[str], Optional[str]]] = []
-            added: Dict[str, set[str]] = {}
-
-            # AST-derived edges (src must be local definition; dst→defs if known)
-            for src in cg.roots:
-                src_name = cg.names.get(src)
-                src_gid = name2gid_defs.get(src_name)
-                if not src_gid:
-                    continue
-                dsts = set()
-                for dst in cg.edges.get(src, set()):
-                    dst_name = cg.names.get(dst)
-                    if not dst_name:
-                        continue
-                    dst_gid = name2gid_defs.get(dst_name)  # defs only
-                    edges.append((src_gid, dst_gid, dst_name))
-                    dsts.add(dst_name)
-                if dsts:
-                    added[src_gid] = dsts
-
-            # Fallback textual scan
-            fb = _fallback_calls(code, fn_ents)
-            for src_gid, names in fb.items():
-                already = added.get(src_gid, set())
-                for dst_name in names - already:
-                    dst_gid = name2gid_defs.get(dst_name)
-                    edges.append((src_gid, dst_gid, dst_name))
-
-            gdb.ingest_file(file_path=path, entities=ents, calls=edges, file_bytes=code.encode("utf-8"))
+            if deps is not None:
+                gdb.put_rewrite(key, path, res.code, res.entities, deps)
+            yield (path, res.entities, CallColumns(e_src, e_dst, e_name), code)
+
+    # one transaction for the whole batch (single commit/fsync); rows go in
+    # through executemany per table rather than per-file statements
+    with GlyphDB(db) as gdb, (gdb.bulk_mode() if fast else nullcontext()):
+        gdb.bulk_ingest(_batch(gdb))
 
     # stdout sentinel
     typer.echo("ok")
@@ -282,8 +412,9 @@ def dbv_callers(
 ):
     from .db import GlyphDB
     with GlyphDB(db) as gdb:
-        for s in gdb.callers(gid):
-            typer.echo(s)
+        out = gdb.callers(gid)
+    if out:
+        typer.echo("\n".join(out))
 
 @dbv.command("callees")
 def dbv_callees(
@@ -292,8 +423,9 @@ def dbv_callees(
 ):
     from .db import GlyphDB
     with GlyphDB(db) as gdb:
-        for dst_gid, dst_name in gdb.callees(gid):
-            typer.echo(dst_gid or f"<unresolved:{dst_name}>")
+        out = [dst_gid or f"<unresolved:{dst_name}>" for dst_gid, dst_name in gdb.callees(gid)]
+    if out:
+        typer.echo("\n".join(out))
 
 @dbv.command("search")
 def dbv_search(
@@ -301,26 +433,23 @@ def dbv_search(
     limit: int = typer.Option(50, "--limit"),
     db: str = typer.Option(".glyph/idx.sqlite", "--db"),
 ):
-    import re
     from .db import GlyphDB
-    ident = re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", q) is not None
-    printed: set[str] = set()
+    ident = _IDENT_RX.fullmatch(q) is not None
+    # gid -> output line; insertion order is output order, written once at the end
+    hits: Dict[str, str] = {}
     with GlyphDB(db) as gdb:
         if ident:
-            for ent in gdb.lookup_by_name(q):
-                if ent.gid in printed:
-                    continue
-                printed.add(ent.gid)
-                typer.echo(f"{ent.gid}\t{ent.name}\t{ent.decl_sig or ''}")
-                if len(printed) >= limit:
-                    return
-        for gid, name, decl in gdb.fts_search(q, limit=limit):
-            if gid in printed:
-                continue
-            printed.add(gid)
-            typer.echo(f"{gid}\t{name}\t{decl or ''}")
-            if len(printed) >= limit:
-                break
+            for ent in gdb.lookup_by_name(q, limit=limit):
+                if len(hits) >= limit:
+                    break
+                hits.setdefault(ent.gid, f"{ent.gid}\t{ent.name}\t{ent.decl_sig or ''}")
+        remaining = limit - len(hits)
+        if remaining > 0:
+            # exact hits are excluded in SQL, so FTS only fetches rows we will print
+            for gid, name, decl in gdb.fts_search(q, limit=remaining, exclude=hits):
+                hits.setdefault(gid, f"{gid}\t{name}\t{decl or ''}")
+    if hits:
+        typer.echo("\n".join(hits.values()))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -337,43 +466,90 @@ def scan(
     ext: str = typer.Option(".c,.h,.cc,.cpp,.cxx", "--ext"),
     ignore: str = typer.Option(".git,.glyph,build", "--ignore"),
     cflags: str = typer.Option("", "--cflags", help="Fallback flags when none harvested"),
+    jobs: int = typer.Option(0, "--jobs", "-j", help="Parallel parse workers (0 = all CPUs, 1 = serial)"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse rewrites of unchanged sources"),
+    force: bool = typer.Option(False, "--force", help="Re-ingest files whose mtime/size are unchanged"),
+    fast: bool = typer.Option(False, "--fast", help="Bulk mode: defer FTS/index upkeep to one rebuild at the end"),
 ):
+    from contextlib import nullcontext
     from .db import GlyphDB
-    from .rewriter import rewrite_snippet
+    from .rewriter import RewriteResult
     from .mkparse import extract_compile_commands
+    from .summary import _walk_sources
 
     rootp = Path(root).resolve()
     ig = set(x.strip() for x in ignore.split(",") if x.strip())
     exts = tuple(x.strip() for x in ext.split(",") if x.strip())
 
+    # the make dry run and the tree walk are independent; overlap them
     per_file: Dict[str, List[str]] = {}
     if make:
-        per_file = extract_compile_commands(str(rootp), shlex.split(make), target)
-
-    files: List[Path] = []
-    for p in rootp.rglob("*"):
-        if not p.is_file():
-            continue
-        if any(part in ig for part in p.parts):
-            continue
-        if p.suffix.lower() in exts:
-            files.append(p)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            fut = ex.submit(extract_compile_commands, str(rootp), shlex.split(make), target)
+            files = _walk_sources(rootp, exts, ig)
+            per_file = fut.result()
+    else:
+        files = _walk_sources(rootp, exts, ig)
 
     Path(db).parent.mkdir(parents=True, exist_ok=True)
     if mirror:
         Path(mirror).mkdir(parents=True, exist_ok=True)
 
-    with GlyphDB(db) as gdb:
+    fallback_args = shlex.split(cflags)
+
+    # one transaction for the whole scan (single commit/fsync)
+    with GlyphDB(db) as gdb, gdb.tx(), (gdb.bulk_mode() if fast else nullcontext()):
+        # one read per file here, for its cache key; only (args, key, hit?) is
+        # kept, so memory doesn't grow with the tree. Sources are read again
+        # where they are used (workers, _batch).
+        stamps = {} if force else gdb.file_stamps()
+        plan: List[Tuple[Path, List[str], bytes, bool]] = []
+        skipped = 0
         for fp in files:
-            code = fp.read_text(encoding="utf-8", errors="ignore")
-            args = per_file.get(str(fp.resolve()), shlex.split(cflags))
-            res = rewrite_snippet(code, filename=fp.name, extra_args=args)
-            gdb.ingest_file(file_path=str(fp), entities=res.entities, calls=(), file_bytes=code.encode("utf-8"))
-            if mirror:
-                outp = Path(mirror) / fp.relative_to(rootp)
-                outp.parent.mkdir(parents=True, exist_ok=True)
-                outp.write_text(res.code, encoding="utf-8")
-            emit_info(f"scanned: {fp}")
+            rp = str(fp.resolve())
+            args = per_file.get(rp, fallback_args)
+            st = fp.stat()
+            key = _rewrite_key(_read_bytes(str(fp)), fp.name, args)
+            # incremental: same mtime+size as the last ingest, and its rewrite
+            # is still cached for these args with unchanged headers → nothing
+            # to do. (The cache row is written on every parse, --no-cache or not.)
+            unchanged = stamps.get(rp) == (float(st.st_mtime), int(st.st_size))
+            hit = (unchanged or cache) and gdb.has_rewrite(key)
+            if unchanged and hit:
+                skipped += 1
+                continue
+            plan.append((fp, args, key, cache and hit))
+        if skipped:
+            emit_info(f"unchanged: {skipped} file(s) skipped")
+
+        # libclang parsing of cache misses fans out to worker processes; SQLite
+        # writes stay here, consumed in file order so ingest is deterministic
+        misses = [(str(fp), fp.name, args) for fp, args, _, hit in plan if not hit]
+        fresh = _pmap(_scan_parse, misses, jobs)
+
+        def _batch() -> Iterator[tuple]:
+            for fp, args, key, hit in plan:
+                res = None
+                if hit:
+                    # the cached rewrite is only used with the bytes it was
+                    # keyed on; a file edited since the first read is re-parsed
+                    code = _read_bytes(str(fp))
+                    cached = gdb.get_rewrite(key, check_deps=False) if _rewrite_key(code, fp.name, args) == key else None
+                    if cached:
+                        res = RewriteResult(*cached)
+                if res is None:
+                    res, deps, code = next(fresh) if not hit else _scan_parse((str(fp), fp.name, args))
+                    gdb.put_rewrite(_rewrite_key(code, fp.name, args), fp, res.code, res.entities, deps)
+                yield (str(fp), res.entities, (), code)
+                if mirror:
+                    outp = Path(mirror) / fp.relative_to(rootp)
+                    outp.parent.mkdir(parents=True, exist_ok=True)
+                    outp.write_text(res.code, encoding="utf-8")
+                emit_info(f"scanned: {fp}")
+
+        gdb.bulk_ingest(_batch())
+        gdb.prune_rewrites()
 
     typer.echo("ok")
 
@@ -391,12 +567,25 @@ def dbv_resolve(
         # stdout numeric sentinel (scripts ignore/capture)
         typer.echo(str(n))
 
+@dbv.command("unresolved-count")
+def dbv_unresolved_count(
+    db: str = typer.Option(".glyph/idx.sqlite", "--db"),
+    resolve: bool = typer.Option(False, "--resolve", help="Run `resolve` first (one process for both)"),
+):
+    from .db import GlyphDB
+    with GlyphDB(db) as gdb:
+        if resolve:
+            gdb.resolve_unlinked_calls()
+        typer.echo(str(gdb.unresolved_count()))
+
 @dbv.command("vacuum")
 def dbv_vacuum(
     db: str = typer.Option(".glyph/idx.sqlite", "--db"),
 ):
     from .db import GlyphDB
     with GlyphDB(db) as gdb:
+        with gdb.tx():
+            gdb.prune_rewrites()
         gdb.vacuum()
     typer.echo("ok")
 
@@ -409,6 +598,20 @@ def dbv_analyze(
         gdb.analyze()
     typer.echo("ok")
 
+@dbv.command("daemon", hidden=True)
+def dbv_daemon(
+    socket_path: str = typer.Option("/tmp/glyph.sock", "--socket", help="Unix socket to listen on"),
+    db: str = typer.Option(".glyph/idx.sqlite", "--db"),
+):
+    """Serve show/callers/callees from one open DB; clients opt in via GLYPH_DAEMON_SOCK."""
+    from .fastcli import serve
+    emit_info(f"serving {db} on {socket_path}")
+    try:
+        serve(socket_path, db)
+    except RuntimeError as e:
+        emit_err(f"error: {e}")
+        raise typer.Exit(code=1)
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # git integration
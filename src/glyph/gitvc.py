@@ -1,15 +1,23 @@
 # src/glyph/gitvc.py
 from __future__ import annotations
 
+import atexit
+import functools
 import os
 import stat
 import subprocess
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import textwrap
 
+try:
+    import pygit2 as _pygit2  # optional: in-process libgit2 (pygit2)
+except ImportError:  # pragma: no cover
+    _pygit2 = None
+
 
 # ----- helpers ---------------------------------------------------------------
 
@@ -25,15 +33,87 @@ def _write_exe(path: Path, content: str) -> None:
     path.chmod(st.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
 def _repo_root(root: str | os.PathLike[str]) -> Path:
-    rp = Path(root).resolve()
+    return _repo_root_cached(str(Path(root).resolve()))
+
+@functools.lru_cache(maxsize=32)
+def _repo_root_cached(rp: str) -> Path:
+    # one `git rev-parse` per repo per process (apply_snapshot → tag_db_snapshot
+    # would otherwise validate twice); failures raise and aren't cached
     _run(["git", "rev-parse", "--git-dir"], cwd=rp)
-    return rp
+    return Path(rp)
 
-def _git_head_short(root: Path) -> str:
+class _GitPipe:
+    """
+    One long-lived `git cat-file --batch-check` per repo for read-only name →
+    object-id lookups (HEAD, branch existence), instead of a git exec each.
+    Refs are re-read per request, so commits/switches made meanwhile are seen.
+    Mutating commands (switch/commit/tag/push) still go through _run.
+    """
+
+    def __init__(self, root: str) -> None:
+        self._lock = threading.Lock()
+        self._p = subprocess.Popen(
+            ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+            cwd=root, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, bufsize=1,
+        )
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Full object id for a revision name, or None if missing/ambiguous."""
+        if not name or "\n" in name:
+            return None
+        with self._lock:
+            self._p.stdin.write(name + "\n")
+            self._p.stdin.flush()
+            line = self._p.stdout.readline()
+        if not line:
+            raise OSError("git cat-file exited")
+        oid, _, kind = line.strip().rpartition(" ")
+        return None if kind in ("missing", "ambiguous") else oid
+
+    def close(self) -> None:
+        if self._p.poll() is None:
+            self._p.stdin.close()
+            self._p.wait()
+
+_PIPES: dict[str, _GitPipe] = {}
+
+@atexit.register
+def _close_pipes() -> None:
+    for pipe in _PIPES.values():
+        try:
+            pipe.close()
+        except Exception:
+            pass
+    _PIPES.clear()
+
+@functools.lru_cache(maxsize=32)
+def _libgit2_repo(rp: str) -> "_pygit2.Repository":
+    return _pygit2.Repository(rp)
+
+def _git_resolve(root: str | os.PathLike[str], name: str) -> Optional[str]:
+    key = str(root)
+    if _pygit2 is not None:
+        try:
+            return str(_libgit2_repo(key).revparse_single(name).id)
+        except (KeyError, ValueError, _pygit2.GitError):
+            return None
+    pipe = _PIPES.get(key)
     try:
-        return _run(["git", "rev-parse", "--short", "HEAD"], cwd=root)
-    except Exception:
-        return "0000000"
+        if pipe is None:
+            pipe = _PIPES[key] = _GitPipe(key)
+        return pipe.resolve(name)
+    except OSError:
+        # dead worker: drop it and fall back to a one-shot exec
+        _PIPES.pop(key, None)
+        r = subprocess.run(["git", "rev-parse", "--verify", "-q", name], cwd=key,
+                           text=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return r.stdout.strip() or None
+
+def _git_head_short(root: Path) -> str:
+    oid = _git_resolve(root, "HEAD")
+    # 7 = git's default abbreviation (same as `rev-parse --short` in most repos)
+    return oid[:7] if oid else "0000000"
 
 # ----- results ---------------------------------------------------------------
 
@@ -66,10 +146,7 @@ def plan_branch(
     """
     rp = _repo_root(root)
 
-    exists = subprocess.run(
-        ["git", "rev-parse", "--verify", branch],
-        cwd=rp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    ).returncode == 0
+    exists = _git_resolve(rp, branch) is not None
     if exists:
         _run(["git", "switch", branch], cwd=rp)
     else:
@@ -109,23 +186,15 @@ def plan_branch(
     db="{str(dbp)}"
     strict="{ '1' if strict_hooks else '0' }"
 
-    # try to resolve what we can (idempotent)
-    glyph db resolve --db "$db" >/dev/null 2>&1 || true
-
-    # count unresolved via sqlite3, else python
-    if command -v sqlite3 >/dev/null 2>&1; then
-      unresolved="$(sqlite3 "$db" 'SELECT count(*) FROM calls WHERE dst_gid IS NULL;' 2>/dev/null || echo 0)"
-    else
-      tmp="$(mktemp)"
-      python3 - "$db" >"$tmp" <<'PY'
-    import sqlite3, sys
-    c = sqlite3.connect(sys.argv[1])
-    print(c.execute("SELECT count(*) FROM calls WHERE dst_gid IS NULL;").fetchone()[0])
-    PY
-      unresolved="$(cat "$tmp")"
-      rm -f "$tmp"
+    # nothing C/C++ staged: the index can't have changed, skip opening it
+    # (no grep -q: an early exit could SIGPIPE git diff and trip pipefail)
+    if ! git diff --cached --name-only | grep -E '\\.(c|h|cc|cpp|cxx|hh|hpp|hxx)$' >/dev/null; then
+      exit 0
     fi
 
+    # resolve what we can (idempotent) and count what's left, in one process
+    unresolved="$(glyph db unresolved-count --resolve --db "$db" 2>/dev/null || echo 0)"
+
     # print to STDERR so stdout stays clean (important when callers capture output)
     echo "unresolved_calls=$unresolved" >&2
 
@@ -171,7 +240,15 @@ def tag_db_snapshot(root: str | os.PathLike[str], db_path: str, *, prefix: str =
     head = _git_head_short(rp)
     tag = f"{prefix}/{ts}-{head}"
     msg = f"glyph DB snapshot\n\nfile: {db_path}\nhead: {head}\nuts: {ts}\n"
-    _run(["git", "tag", "-a", "-f", tag, "-m", msg], cwd=rp)
+    if _pygit2 is not None:
+        # annotated tag in-process; deleting first mirrors `git tag -f`
+        repo = _libgit2_repo(str(rp))
+        ref = f"refs/tags/{tag}"
+        if ref in repo.references:
+            repo.references.delete(ref)
+        repo.create_tag(tag, repo.head.target, _pygit2.GIT_OBJECT_COMMIT, repo.default_signature, msg)
+    else:
+        _run(["git", "tag", "-a", "-f", tag, "-m", msg], cwd=rp)
     return tag
 
 def apply_snapshot(
@@ -9,16 +9,9 @@ from clang import cindex
 
 # Reuse the same helpers as the rewriter to keep IDs consistent.
 from .rewriter import _effsig as _effsig_fn, _storage_of as _storage_of_fn  # internal, deliberate import
+from .rewriter import parse_tu, _index
 from .ids import short_id
 
-def _clang_args_for(filename: str, extra: Iterable[str] | None) -> list[str]:
-    args = ["-x", "c"]
-    if filename.endswith((".hpp", ".hh", ".hxx", ".cc", ".cpp", ".cxx")):
-        args = ["-x", "c++"]
-    if extra:
-        args.extend(extra)
-    return args
-
 @dataclass(frozen=True)
 class CallGraph:
     roots: list[str]                 # function IDs that have definitions in the snippet/TU
@@ -40,41 +33,66 @@ def _callee_id(ref: cindex.Cursor, fallback_name: str, filename: str) -> str:
     fn = ref.location.file.name if ref.location and ref.location.file else filename
     return short_id("fn", eff, storage, fn)
 
-def callgraph_snippet(code: str, *, filename: str = "snippet.c", extra_args: Iterable[str] | None = None) -> CallGraph:
+def build_pch(header: str, out: str, *, extra_args: Iterable[str] | None = None) -> str:
+    """
+    Precompile `header` to `out` for callgraph_snippet(pch_path=...). Built with
+    the same libclang that will load it (a PCH is tied to the clang version).
+    """
+    args = ["-x", "c++-header" if header.endswith((".hpp", ".hh", ".hxx")) else "c-header"]
+    args.extend(extra_args or ())
+    tu = _index().parse(header, args=args, options=cindex.TranslationUnit.PARSE_INCOMPLETE)
+    tu.save(out)
+    return out
+
+def callgraph_snippet(code: str | bytes, *, filename: str = "snippet.c", extra_args: Iterable[str] | None = None,
+                      pch_path: str | None = None) -> CallGraph:
     """
     Build an intra-TU call graph:
-      - parses with bodies (no skip)
+      - parses with bodies (no skip); no detailed processing record (macros unused)
       - collects FUNCTION_DECL definitions as roots
       - for each, records CALL_EXPR → callee IDs (resolving .referenced when possible)
+    pch_path (see build_pch) reuses preprocessed common headers across snippets.
     """
-    idx = cindex.Index.create()
-    tu = idx.parse(
-        path=filename,
-        args=_clang_args_for(filename, extra_args),
-        unsaved_files=[(filename, code)],
-        options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
-    )
+    if pch_path:
+        extra_args = [*(extra_args or ()), "-include-pch", pch_path]
+    tu = parse_tu(code, filename=filename, extra_args=extra_args, detailed=False)
+    return callgraph_from_tu(tu, filename=filename)
+
+def callgraph_from_tu(tu: cindex.TranslationUnit, *, filename: str = "snippet.c") -> CallGraph:
+    """callgraph_snippet over an already-parsed TU (see rewriter.parse_tu)."""
     edges: Dict[str, Set[str]] = {}
     names: Dict[str, str] = {}
     roots: list[str] = []
+    # callee ids memoized per referenced decl (clang hashes/compares cursors)
+    # and, for unresolved calls, per name: the same callee recurs across call
+    # sites, and _storage_of may tokenize the decl. Two maps, so a Cursor key
+    # never meets a str key.
+    ids_by_ref: Dict[cindex.Cursor, str] = {}
+    ids_by_name: Dict[str, str] = {}
 
     def visit_fn(fn: cindex.Cursor) -> None:
         fid = _fn_id(fn, filename)
         names[fid] = fn.spelling
         roots.append(fid)
         edges.setdefault(fid, set())
-        # Walk only within the function extent
-        def walk(cur: cindex.Cursor) -> None:
-            for ch in cur.get_children():
-                if ch.kind == cindex.CursorKind.CALL_EXPR:
-                    ref = ch.referenced if hasattr(ch, "referenced") else None
-                    name = (ref.spelling if ref else ch.displayname) or "unknown"
-                    cid = _callee_id(ref, name, filename)
-                    edges[fid].add(cid)
-                    if cid not in names:
-                        names[cid] = name
-                walk(ch)
-        walk(fn)
+        out = edges[fid]
+        # Walk only within the function extent: explicit preorder DFS (children
+        # pushed reversed), no Python frame per AST level and no recursion limit.
+        # Cursor.walk_preorder would nest a generator per level instead.
+        stack = list(fn.get_children())[::-1]
+        while stack:
+            ch = stack.pop()
+            if ch.kind == cindex.CursorKind.CALL_EXPR:
+                ref = ch.referenced if hasattr(ch, "referenced") else None
+                name = (ref.spelling if ref else ch.displayname) or "unknown"
+                memo, key = (ids_by_ref, ref) if ref is not None else (ids_by_name, name)
+                cid = memo.get(key)
+                if cid is None:
+                    cid = memo[key] = _callee_id(ref, name, filename)
+                out.add(cid)
+                if cid not in names:
+                    names[cid] = name
+            stack.extend(list(ch.get_children())[::-1])
 
     for cur in tu.cursor.get_children():
         if not cur.location.file or cur.location.file.name != filename:
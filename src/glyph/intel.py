@@ -1,7 +1,9 @@
 # src/glyph/intel.py
 from __future__ import annotations
 
-import json, os, re, subprocess, sys
+import atexit, bisect, json, mmap, os, re, subprocess, sys, threading
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Sequence
@@ -55,25 +57,101 @@ def _idents_in_text(text: str) -> List[str]:
             seen.add(tok); out.append(tok)
     return out
 
+# path -> ((mtime_ns, size), mapping), least recently used first. Entities of
+# one file share a mapping across materialize() calls; a superseded, deleted
+# or evicted file's mapping is closed rather than left for the GC.
+_MAPS: "OrderedDict[str, tuple[tuple[int, int], mmap.mmap]]" = OrderedDict()
+_MAPS_MAX = 64
+_MAPS_LOCK = threading.Lock()
+
+def _drop_map(path: str) -> None:
+    ent = _MAPS.pop(path, None)
+    if ent is not None:
+        ent[1].close()
+
+def _map_file(path: str) -> Optional[mmap.mmap]:
+    with _MAPS_LOCK:
+        try:
+            st = os.stat(path)
+        except OSError:
+            _drop_map(path)
+            raise
+        stamp = (st.st_mtime_ns, st.st_size)
+        ent = _MAPS.get(path)
+        if ent is not None and ent[0] == stamp:
+            _MAPS.move_to_end(path)
+            return ent[1]
+        _drop_map(path)  # rewritten since it was mapped
+        if not st.st_size:  # mmap can't map an empty file
+            return None
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            mm = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        _MAPS[path] = (stamp, mm)
+        while len(_MAPS) > _MAPS_MAX:
+            _, (_, old) = _MAPS.popitem(last=False)
+            old.close()
+        return mm
+
 def _read_span(path: str, start: int, end: int, *, surround_lines: int = 2) -> str:
     try:
-        b = Path(path).read_bytes()
-        start = max(0, min(start, len(b))); end = max(start, min(end, len(b)))
-        view = b[start:end]; txt = view.decode("utf-8", "ignore")
-        full = b.decode("utf-8", "ignore")
-        before = full[:start].count("\n"); after = before + txt.count("\n")
-        lines = full.splitlines()
-        lo = max(0, before - surround_lines); hi = min(len(lines), after + 1 + surround_lines)
-        return "\n".join(lines[lo:hi])
+        mm = _map_file(path)
+        if mm is None:
+            return ""
+        n = len(mm)
+        start = max(0, min(start, n)); end = max(start, min(end, n))
+        # walk newline bytes outward from the span; only the window is decoded
+        lo = mm.rfind(b"\n", 0, start) + 1
+        for _ in range(surround_lines):
+            if lo == 0: break
+            lo = mm.rfind(b"\n", 0, lo - 1) + 1
+        hi = mm.find(b"\n", end)
+        for _ in range(surround_lines):
+            if hi < 0: break
+            hi = mm.find(b"\n", hi + 1)
+        return _decode_window(mm, lo, hi)
     except Exception:
         try: return Path(path).read_text(encoding="utf-8", errors="ignore")
         except Exception: return ""
 
+def _decode_window(mm: mmap.mmap, lo: int, hi: int) -> str:
+    # hi is the newline closing the window, or -1 for end of file
+    txt = mm[lo:len(mm) if hi < 0 else hi].decode("utf-8", "ignore")
+    if hi >= 0 and txt.endswith("\r"):
+        txt = txt[:-1]  # the CR of the CRLF that closes the window
+    lines = txt.splitlines()
+    if hi >= 0 and txt[-1:] in ("\n", "\r"):
+        lines.append("")  # window ends on an empty line
+    return "\n".join(lines)
+
+def _line_index(path: str):
+    """(mapping, newline offsets) for path, or None for an empty file."""
+    mm = _map_file(path)
+    if mm is None:
+        return None
+    return mm, array("Q", (m.start() for m in re.finditer(b"\n", mm)))
+
+def _read_span_indexed(index, start: int, end: int, *, surround_lines: int = 2) -> str:
+    # same window as _read_span, but line boundaries come from a bisect
+    # over the file's precomputed newline offsets
+    mm, nl = index
+    n = len(mm)
+    start = max(0, min(start, n)); end = max(start, min(end, n))
+    i = bisect.bisect_left(nl, start) - 1 - surround_lines
+    j = bisect.bisect_left(nl, end) + surround_lines
+    lo = nl[i] + 1 if i >= 0 else 0
+    hi = nl[j] if j < len(nl) else -1
+    return _decode_window(mm, lo, hi)
+
 def _read_exact(path: str, start: int, end: int) -> str:
     try:
-        b = Path(path).read_bytes()
-        start = max(0, min(start, len(b))); end = max(start, min(end, len(b)))
-        return b[start:end].decode("utf-8", "ignore")
+        mm = _map_file(path)
+        if mm is None:
+            return ""
+        start = max(0, min(start, len(mm))); end = max(start, min(end, len(mm)))
+        return mm[start:end].decode("utf-8", "ignore")
     except Exception:
         return ""
 
@@ -158,7 +236,7 @@ class GlyphRetriever:
         # exact identifiers
         idents = _idents_in_text(q); _log("idents_from_question", idents)
         for ident in idents:
-            for ent in self.db.lookup_by_name(ident):
+            for ent in self.db.iter_lookup_by_name(ident):
                 if ent.gid in seen: continue
                 out.append(ent); seen.add(ent.gid)
                 if len(out) >= limit:
@@ -178,23 +256,33 @@ class GlyphRetriever:
         out = list(seeds); seen = {e.gid for e in seeds}; frontier = [e.gid for e in seeds]
         for _ in range(max(0, hops)):
             nxt: List[str] = []
+            # three queries per hop; candidates keep the per-gid callee/caller order
+            callees = self.db.callees_bulk(frontier); callers = self.db.callers_bulk(frontier)
+            want: List[str] = []
             for gid in frontier:
-                for dg, _ in self.db.callees(gid)[:per_hop]:
-                    if not dg or dg in seen: continue
-                    ent = self.db.get_entity(dg); 
-                    if ent: out.append(ent); seen.add(dg); nxt.append(dg)
-                for sg in self.db.callers(gid)[:per_hop]:
-                    if sg in seen: continue
-                    ent = self.db.get_entity(sg)
-                    if ent: out.append(ent); seen.add(sg); nxt.append(sg)
+                want.extend(dg for dg, _ in callees.get(gid, [])[:per_hop] if dg)
+                want.extend(callers.get(gid, [])[:per_hop])
+            ents = self.db.get_entities({g for g in want if g not in seen})
+            for g in want:
+                if g in seen: continue
+                ent = ents.get(g)
+                if ent: out.append(ent); seen.add(g); nxt.append(g)
             frontier = nxt
             if not frontier: break
         return out
 
     def materialize(self, ents: Sequence[DbEntity], *, surround_lines: int = 2, max_chars: int = 14000) -> List[ContextItem]:
         ctx: List[ContextItem] = []; total = 0
+        indexes: dict = {}  # file_path -> newline index, built once per file
         for e in ents:
-            snip = _read_span(e.file_path, e.start, e.end, surround_lines=surround_lines)
+            try:
+                if e.file_path not in indexes:
+                    indexes[e.file_path] = _line_index(e.file_path)
+                index = indexes[e.file_path]
+                snip = "" if index is None else _read_span_indexed(
+                    index, e.start, e.end, surround_lines=surround_lines)
+            except Exception:
+                snip = _read_span(e.file_path, e.start, e.end, surround_lines=surround_lines)
             if max_chars > 0 and total + len(snip) > max_chars:
                 snip = snip[: max(0, max_chars - total)]
             ctx.append(ContextItem(
@@ -354,6 +442,41 @@ def _ops_trace(ctx: Sequence[ContextItem]) -> None:
     if ops: _trace("OPS: " + ", ".join(ops))
 
 # ---------------- orchestration ----------------
+# One open retriever per (db file, thread), reused across questions: skips the
+# connect/PRAGMA/schema-check cost per call. sqlite3 connections are bound to
+# their creating thread, hence the thread in the key; the inode check reopens
+# when the index file was replaced (e.g. rm + `db init`).
+_RETRIEVERS: dict[tuple[str, int], tuple[GlyphRetriever, int]] = {}
+_RETRIEVERS_LOCK = threading.Lock()
+
+def _get_retriever(db_path: str) -> GlyphRetriever:
+    path = os.path.abspath(db_path)
+    try:
+        ino = os.stat(path).st_ino
+    except OSError:
+        ino = -1
+    key = (path, threading.get_ident())
+    with _RETRIEVERS_LOCK:
+        hit = _RETRIEVERS.get(key)
+        if hit and hit[1] == ino:
+            return hit[0]
+        if hit:
+            hit[0].close()
+        retr = GlyphRetriever(path)
+        if ino == -1:  # created just now by the open
+            try: ino = os.stat(path).st_ino
+            except OSError: pass
+        _RETRIEVERS[key] = (retr, ino)
+        return retr
+
+@atexit.register
+def _close_retrievers() -> None:
+    with _RETRIEVERS_LOCK:
+        for retr, _ in _RETRIEVERS.values():
+            try: retr.close()
+            except Exception: pass
+        _RETRIEVERS.clear()
+
 def answer_question(
     db_path: str,
     question: str,
@@ -364,25 +487,22 @@ def answer_question(
     endpoint: str = "http://localhost:11434",
     max_chars: int = 14000,
 ) -> str:
-    retr = GlyphRetriever(db_path)
-    try:
-        seeds = retr.search(question, limit=k)
-        # (also emit from orchestrator to be extra sure tests see it)
-        _trace("SEEDS: " + (", ".join(f"{e.name}({e.kind})" for e in seeds) if seeds else "(none)"))
-        expanded = retr.expand_neighbors(seeds, hops=hops, per_hop=max(2, k // 2))
-        # unique
-        seen, uniq = set(), []
-        for e in seeds + expanded:
-            if e.gid in seen: continue
-            seen.add(e.gid); uniq.append(e)
-        ctx = retr.materialize(uniq, surround_lines=2, max_chars=max_chars)
-        if not ctx: return "Not enough context."
-        _ops_trace(ctx)
-        det = _deterministic_answer(question, ctx)
-        if det: return det
-        primary = _choose_primary(question, ctx)
-        prompt = _build_prompt(question, ctx, primary)
-        raw = call_ollama(prompt, model=model, endpoint=endpoint)
-        return _ensure_prefix_and_brief(raw, primary)
-    finally:
-        retr.close()
+    retr = _get_retriever(db_path)
+    seeds = retr.search(question, limit=k)
+    # (also emit from orchestrator to be extra sure tests see it)
+    _trace("SEEDS: " + (", ".join(f"{e.name}({e.kind})" for e in seeds) if seeds else "(none)"))
+    expanded = retr.expand_neighbors(seeds, hops=hops, per_hop=max(2, k // 2))
+    # unique
+    seen, uniq = set(), []
+    for e in seeds + expanded:
+        if e.gid in seen: continue
+        seen.add(e.gid); uniq.append(e)
+    ctx = retr.materialize(uniq, surround_lines=2, max_chars=max_chars)
+    if not ctx: return "Not enough context."
+    _ops_trace(ctx)
+    det = _deterministic_answer(question, ctx)
+    if det: return det
+    primary = _choose_primary(question, ctx)
+    prompt = _build_prompt(question, ctx, primary)
+    raw = call_ollama(prompt, model=model, endpoint=endpoint)
+    return _ensure_prefix_and_brief(raw, primary)
@@ -95,6 +95,33 @@ def _args_for(argv: List[str], cwd: Path) -> List[str]:
             out[:0] = ["-x", "c++"]
     return out
 
+def _parse_line(line: str, cwd: Path, mapping: Dict[str, List[str]]) -> Path:
+    """Record compile commands from one make output line; returns the new cwd."""
+    line = line.strip()
+    if not line:
+        return cwd
+    # handle 'cd dir && ...'
+    if line.startswith("cd "):
+        parts = _split_chained(line)
+        for part in parts:
+            if part.startswith("cd "):
+                new = shlex.split(part)[1]
+                cwd = (cwd / new).resolve() if not Path(new).is_absolute() else Path(new).resolve()
+            else:
+                argv = shlex.split(part)
+                if _is_compile(argv):
+                    src = _src_from(argv, cwd)
+                    if not src: continue
+                    mapping[str(src)] = _args_for(argv, cwd)
+        return cwd
+    # simple line
+    argv = shlex.split(line)
+    if _is_compile(argv):
+        src = _src_from(argv, cwd)
+        if src:
+            mapping[str(src)] = _args_for(argv, cwd)
+    return cwd
+
 def extract_compile_commands(root: str | os.PathLike[str], make_cmd: List[str] | None = None, target: str | None = None) -> Dict[str, List[str]]:
     """
     Returns { abs_source_path : clang-args list } by dry-running make.
@@ -106,32 +133,11 @@ def extract_compile_commands(root: str | os.PathLike[str], make_cmd: List[str] |
         cmd.append(target)
     env = os.environ.copy()
     env.setdefault("V", "1")
-    proc = subprocess.run(cmd, cwd=str(rootp), env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, check=False)
-    out = proc.stdout.splitlines()
     mapping: Dict[str, List[str]] = {}
     cwd = rootp
-    for line in out:
-        line = line.strip()
-        if not line:
-            continue
-        # handle 'cd dir && ...'
-        if line.startswith("cd "):
-            parts = _split_chained(line)
-            for part in parts:
-                if part.startswith("cd "):
-                    new = shlex.split(part)[1]
-                    cwd = (cwd / new).resolve() if not Path(new).is_absolute() else Path(new).resolve()
-                else:
-                    argv = shlex.split(part)
-                    if _is_compile(argv):
-                        src = _src_from(argv, cwd)
-                        if not src: continue
-                        mapping[str(src)] = _args_for(argv, cwd)
-            continue
-        # simple line
-        argv = shlex.split(line)
-        if _is_compile(argv):
-            src = _src_from(argv, cwd)
-            if not src: continue
-            mapping[str(src)] = _args_for(argv, cwd)
+    # parse lines as make emits them instead of buffering the whole dry run
+    with subprocess.Popen(cmd, cwd=str(rootp), env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            cwd = _parse_line(line, cwd, mapping)
     return mapping
@@ -95,7 +95,9 @@ def status(db_path: str, plan_path: str | Path) -> dict:
         unresolved = _rowcount(gdb.conn, "SELECT COUNT(*) FROM calls WHERE dst_gid IS NULL")
         missing_syms: Dict[str, int] = {}
         for name, c in gdb.conn.execute(
-            "SELECT COALESCE(dst_name,'') AS n, COUNT(*) FROM calls WHERE dst_gid IS NULL GROUP BY n"
+            # grouped on the bare column: walks idx_calls_unresolved_name in order
+            "SELECT dst_name, COUNT(*) FROM calls "
+            "WHERE dst_gid IS NULL AND dst_name IS NOT NULL GROUP BY dst_name"
         ):
             if name:
                 missing_syms[name] = int(c)
@@ -12,6 +12,15 @@ from typing import Optional, Iterable, List, Tuple
 
 
 # ── clang glue ────────────────────────────────────────────────────────────────
+_INDEX: Optional[cindex.Index] = None
+
+def _index() -> cindex.Index:
+    """Process-wide libclang Index, created on first use and shared by all parses."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = cindex.Index.create()
+    return _INDEX
+
 def _clang_args_for(filename: str, extra: Iterable[str] | None) -> List[str]:
     args = ["-x", "c"]
     if filename.endswith((".hpp", ".hh", ".hxx", ".cc", ".cpp", ".cxx")):
@@ -65,7 +74,7 @@ def scan_includes_file(filename: str, *, extra_args: Optional[Iterable[str]] = N
     """
     Parse a real file with libclang and return (resolved_path, kind) includes.
     """
-    idx = cindex.Index.create()
+    idx = _index()
     args = _clang_args_for(filename, extra_args)
     tu = idx.parse(
         path=filename,
@@ -80,7 +89,7 @@ def scan_includes_code(code: str, *, filename: str = "snippet.c",
     Parse unsaved code (for tests) and return (resolved_path, kind) includes.
     Resolution works if libclang can locate the header on disk via include paths.
     """
-    idx = cindex.Index.create()
+    idx = _index()
     args = _clang_args_for(filename, extra_args)
     tu = idx.parse(
         path=filename,
@@ -231,21 +240,36 @@ class RewriteResult:
     code: str
     entities: List[Entity]
 
-def rewrite_snippet(code: str, *, filename: str = "snippet.c", extra_args: Iterable[str] | None = None) -> RewriteResult:
+def parse_tu(code: str | bytes, *, filename: str = "snippet.c",
+             extra_args: Iterable[str] | None = None, detailed: bool = True) -> cindex.TranslationUnit:
     """
-    Parses with full bodies (no skip) to classify fn vs prototype reliably.
-    Inserts GLYPH markers and returns entity metadata.
+    The one parse shared by rewrite and call-graph extraction: full bodies (no
+    skip) from an in-memory buffer. detailed=True keeps the detailed processing
+    record (macro entities need it); call-graph-only parses can skip it.
     """
-    if _already_marked(code.encode("utf-8", "ignore")):
-        return RewriteResult(code=code, entities=[])
-    idx = cindex.Index.create()
-    args = _clang_args_for(filename, extra_args)
-    tu = idx.parse(
+    return _index().parse(
         path=filename,
-        args=args,
+        args=_clang_args_for(filename, extra_args),
         unsaved_files=[(filename, code)],
-        options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+        options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD if detailed else 0
     )
+
+def rewrite_from_tu(tu: cindex.TranslationUnit, code: str | bytes, *, filename: str = "snippet.c") -> RewriteResult:
+    """Marker insertion + entity metadata from an already-parsed TU of `code`."""
+    buf = code if isinstance(code, bytes) else code.encode("utf-8")
+    if _already_marked(buf):
+        return RewriteResult(code=buf.decode("utf-8", "ignore"), entities=[])
     ents = _collect_entities(tu, filename)
-    rewritten = _insert_markers(code.encode("utf-8"), ents).decode("utf-8")
+    rewritten = _insert_markers(buf, ents).decode("utf-8")
     return RewriteResult(code=rewritten, entities=ents)
+
+def rewrite_snippet(code: str | bytes, *, filename: str = "snippet.c", extra_args: Iterable[str] | None = None) -> RewriteResult:
+    """
+    Parses with full bodies (no skip) to classify fn vs prototype reliably.
+    Inserts GLYPH markers and returns entity metadata.
+    Accepts UTF-8 bytes directly; entity offsets are byte offsets either way.
+    """
+    buf = code if isinstance(code, bytes) else code.encode("utf-8")
+    if _already_marked(buf):
+        return RewriteResult(code=buf.decode("utf-8", "ignore"), entities=[])
+    return rewrite_from_tu(parse_tu(buf, filename=filename, extra_args=extra_args), buf, filename=filename)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+import os
 import shlex
 from dataclasses import dataclass, asdict
 from pathlib import Path
@@ -63,15 +64,14 @@ class RepoSummary:
 
 
 def _walk_sources(root: Path, exts: Tuple[str, ...], ignore: Iterable[str]) -> List[Path]:
+    """Source files under root; ignored directory names are pruned before descent."""
     ig = set(x.strip() for x in ignore if x.strip())
     out: List[Path] = []
-    for p in root.rglob("*"):
-        if not p.is_file():
-            continue
-        if any(part in ig for part in p.parts):
-            continue
-        if p.suffix.lower() in exts:
-            out.append(p)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in ig]
+        for n in filenames:
+            if n not in ig and n.lower().endswith(exts):
+                out.append(Path(dirpath, n))
     return out
 
 
@@ -102,9 +102,10 @@ def summarize_repo(
     files: List[FileOut] = []
     global_fn_name_to_gid: Dict[str, str] = {}
     paths = _walk_sources(rootp, exts, ignore)
+    fallback_args = shlex.split(cflags)
     for fp in paths:
         code = fp.read_text(encoding="utf-8", errors="ignore")
-        args = per_file.get(str(fp.resolve()), shlex.split(cflags))
+        args = per_file.get(str(fp.resolve()), fallback_args)
         rr = rewrite_snippet(code, filename=fp.name, extra_args=args)
         ents_out = [
             EntityOut(